@@ -0,0 +1,76 @@
+"""
+AST cache for ClearScript
+
+Stores parsed programs on disk keyed by a hash of their source, so
+scripts that have not changed since the last run skip lexing and
+parsing entirely.
+"""
+
+import os
+import pickle
+import hashlib
+from pathlib import Path
+from typing import Optional
+from .lexer import Lexer
+from .parser import Parser
+from .ast_nodes import Program
+
+# Part of every cache key; bump when AST node classes or parser output change
+PARSER_VERSION = 3
+
+
+def default_cache_dir() -> Path:
+    """Return the cache directory, honoring XDG_CACHE_HOME."""
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'clearscript' / 'ast'
+
+
+def load_or_parse(source: str, memoize: bool = False, keep_comments: bool = False,
+                  cache_dir: Optional[Path] = None, fold_constants: bool = False) -> Program:
+    """
+    Return the AST for source, reusing a cached copy when one exists.
+    
+    The cache is best-effort: an unreadable or stale entry is parsed
+    again, and failing to write one never fails the compile.
+    
+    Args:
+        source: ClearScript source code
+        memoize: Passed to the Parser on a cache miss
+        keep_comments: Passed to the Parser; part of the cache key since
+            it changes the resulting AST
+        cache_dir: Directory for cache entries (default: default_cache_dir())
+        fold_constants: Passed to the Parser; part of the cache key for the
+            same reason
+    
+    Returns:
+        The parsed Program
+    """
+    cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+    digest = hashlib.sha256(source.encode('utf-8')).hexdigest()
+    suffix = ('-comments' if keep_comments else '') + ('-folded' if fold_constants else '')
+    path = cache_dir / f"{digest}-v{PARSER_VERSION}{suffix}.pkl"
+    
+    try:
+        with open(path, 'rb') as f:
+            cached = pickle.load(f)
+    except Exception:
+        # A truncated, foreign or hand-edited entry can fail in many ways
+        # (bad protocol, missing module, recursion, ...); all mean a miss
+        cached = None
+    if isinstance(cached, Program):
+        return cached
+    
+    program = Parser(Lexer(source).tokenize(), memoize=memoize, keep_comments=keep_comments,
+                     fold_constants=fold_constants).parse()
+    
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # Write then rename, so a concurrent reader never sees half a file
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(program, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except (OSError, RecursionError, pickle.PicklingError):
+        pass
+    
+    return program
@@ -5,24 +5,49 @@ This module defines all the Abstract Syntax Tree node types used
 during parsing and code generation.
 """
 
-from dataclasses import dataclass, field
+import sys
+from dataclasses import dataclass, field, fields
 from typing import List, Optional, Any
 
 
-@dataclass
+def _add_slots(cls):
+    """Recreate a dataclass with __slots__ for its own fields (pre-3.10 fallback)."""
+    cls_dict = dict(cls.__dict__)
+    inherited = set()
+    for base in cls.__mro__[1:]:
+        inherited.update(getattr(base, '__slots__', ()))
+    field_names = tuple(f.name for f in fields(cls))
+    cls_dict['__slots__'] = tuple(name for name in field_names if name not in inherited)
+    for name in field_names:
+        # Defaults live on the generated __init__, not as class attributes
+        cls_dict.pop(name, None)
+    cls_dict.pop('__dict__', None)
+    cls_dict.pop('__weakref__', None)
+    return type(cls)(cls.__name__, cls.__bases__, cls_dict)
+
+
+if sys.version_info >= (3, 10):
+    _node = dataclass(slots=True)
+else:
+    def _node(cls):
+        """Declare an AST node: a dataclass without a per-instance __dict__."""
+        return _add_slots(dataclass(cls))
+
+
+@_node
 class ASTNode:
     """Base class for all AST nodes."""
     line: int = 0
     column: int = 0
 
 
-@dataclass
+@_node
 class Program(ASTNode):
     """Root node representing the entire program."""
     statements: List[ASTNode] = field(default_factory=list)
 
 
-@dataclass
+@_node
 class VariableDeclaration(ASTNode):
     """Variable declaration: int x = 5;"""
     var_type: str = ""  # 'int', 'float', etc.
@@ -30,21 +55,14 @@ class VariableDeclaration(ASTNode):
     value: Optional[ASTNode] = None
 
 
-@dataclass
+@_node
 class Assignment(ASTNode):
     """Assignment statement: x = 5;"""
     target: str = ""
     value: Optional[ASTNode] = None
 
 
-@dataclass
-class ArrayAccess(ASTNode):
-    """Array access: arr[index]"""
-    name: str = ""
-    index: Optional[ASTNode] = None
-
-
-@dataclass
+@_node
 class ArrayAssignment(ASTNode):
     """Array assignment: portout[1] = 0;"""
     name: str = ""
@@ -52,7 +70,7 @@ class ArrayAssignment(ASTNode):
     value: Optional[ASTNode] = None
 
 
-@dataclass
+@_node
 class BinaryOp(ASTNode):
     """Binary operation: a + b, a && b, etc."""
     left: Optional[ASTNode] = None
@@ -60,7 +78,7 @@ class BinaryOp(ASTNode):
     right: Optional[ASTNode] = None
 
 
-@dataclass
+@_node
 class UnaryOp(ASTNode):
     """Unary operation: !x, -x, x++, x--"""
     operator: str = ""  # '!', '-', '++', '--'
@@ -68,20 +86,20 @@ class UnaryOp(ASTNode):
     is_postfix: bool = False  # For ++ and --
 
 
-@dataclass
+@_node
 class Literal(ASTNode):
     """Literal value: 42, 3.14, "hello" """
     value: Any = None
     literal_type: str = ""  # 'int', 'float', 'string'
 
 
-@dataclass
+@_node
 class Identifier(ASTNode):
     """Variable or function identifier."""
     name: str = ""
 
 
-@dataclass
+@_node
 class CallbackDeclaration(ASTNode):
     """Callback declaration: callback portin[1] up { ... }"""
     port_type: str = ""  # 'portin', 'portout'
@@ -90,7 +108,7 @@ class CallbackDeclaration(ASTNode):
     body: List[ASTNode] = field(default_factory=list)
 
 
-@dataclass
+@_node
 class IfStatement(ASTNode):
     """If/else statement."""
     condition: Optional[ASTNode] = None
@@ -98,27 +116,27 @@ class IfStatement(ASTNode):
     else_body: Optional[List[ASTNode]] = None
 
 
-@dataclass
+@_node
 class WhileStatement(ASTNode):
     """While loop."""
     condition: Optional[ASTNode] = None
     body: List[ASTNode] = field(default_factory=list)
 
 
-@dataclass
+@_node
 class DoInBlock(ASTNode):
     """Do-in block for scheduled execution: do in 500 { ... }"""
     delay: Optional[ASTNode] = None  # milliseconds
     body: List[ASTNode] = field(default_factory=list)
 
 
-@dataclass
+@_node
 class ExpressionStatement(ASTNode):
     """Statement that wraps an expression."""
     expression: Optional[ASTNode] = None
 
 
-@dataclass
+@_node
 class Comment(ASTNode):
     """Comment (preserved for documentation)."""
     text: str = ""
@@ -127,7 +145,7 @@ class Comment(ASTNode):
 
 # === StateScript-Specific Nodes ===
 
-@dataclass
+@_node
 class FunctionDeclaration(ASTNode):
     """Function declaration: function name(param1, param2) { ... }"""
     name: str = ""
@@ -135,77 +153,77 @@ class FunctionDeclaration(ASTNode):
     body: List[ASTNode] = field(default_factory=list)
 
 
-@dataclass
+@_node
 class LabelDeclaration(ASTNode):
     """Label declaration: label: name"""
     name: str = ""
 
 
-@dataclass
+@_node
 class GotoStatement(ASTNode):
     """Goto statement: goto label; or goto label if (condition);"""
     label: str = ""
     condition: Optional[ASTNode] = None
 
 
-@dataclass
+@_node
 class WaitStatement(ASTNode):
     """Wait statement: wait(time);"""
     time: Optional[ASTNode] = None
     result_var: str = ""  # Optional variable to store actual wait time
 
 
-@dataclass
+@_node
 class WaitForStatement(ASTNode):
     """WaitFor statement: waitfor(condition);"""
     condition: Optional[ASTNode] = None
 
 
-@dataclass
+@_node
 class KillStatement(ASTNode):
     """Kill statement: kill();"""
     pass  # No fields needed
 
 
-@dataclass
+@_node
 class ReturnStatement(ASTNode):
     """Return statement: return;"""
     pass  # No fields needed
 
 
-@dataclass
+@_node
 class ThreadStatement(ASTNode):
     """Thread statement: thread(label, arg1, arg2, ...);"""
     label: str = ""
     args: List[ASTNode] = field(default_factory=list)
 
 
-@dataclass
+@_node
 class SetStatement(ASTNode):
     """Set statement: set(var, value);"""
     variable: str = ""
     value: Optional[ASTNode] = None
 
 
-@dataclass
+@_node
 class PushStatement(ASTNode):
     """Push statement: push(value);"""
     value: Optional[ASTNode] = None
 
 
-@dataclass
+@_node
 class PopStatement(ASTNode):
     """Pop statement: pop(variable);"""
     variable: str = ""
 
 
-@dataclass
+@_node
 class PeekStatement(ASTNode):
     """Peek statement: peek(variable);"""
     variable: str = ""
 
 
-@dataclass
+@_node
 class SpawnBotCall(ASTNode):
     """SpawnBot call: spawnbot(template, location, attr1, val1, ...);"""
     template: Optional[ASTNode] = None
@@ -213,14 +231,14 @@ class SpawnBotCall(ASTNode):
     attributes: List[ASTNode] = field(default_factory=list)  # Pairs of attr/value
 
 
-@dataclass
+@_node
 class MoveToCall(ASTNode):
     """MoveTo call: moveto(prop, location);"""
     prop: Optional[ASTNode] = None
     location: Optional[ASTNode] = None
 
 
-@dataclass
+@_node
 class AnimateCall(ASTNode):
     """Animate call: animate(prop, location, time);"""
     prop: Optional[ASTNode] = None
@@ -228,20 +246,20 @@ class AnimateCall(ASTNode):
     time: Optional[ASTNode] = None
 
 
-@dataclass
+@_node
 class DeleteCall(ASTNode):
     """Delete call: delete(prop);"""
     prop: Optional[ASTNode] = None
 
 
-@dataclass
+@_node
 class FunctionCall(ASTNode):
     """User-defined function call: functionName(arg1, arg2, ...);"""
     name: str = ""
     args: List[ASTNode] = field(default_factory=list)
 
 
-@dataclass
+@_node
 class RawBlock(ASTNode):
     """Raw StateScript block: raw { ... }"""
     code: str = ""
@@ -251,7 +269,7 @@ class RawBlock(ASTNode):
 # OOP and Advanced Features
 # ============================================================================
 
-@dataclass
+@_node
 class ClassDeclaration(ASTNode):
     """Class declaration: class Name { properties... methods... }"""
     name: str = ""
@@ -259,14 +277,14 @@ class ClassDeclaration(ASTNode):
     methods: List[ASTNode] = field(default_factory=list)  # MethodDeclaration nodes
 
 
-@dataclass
+@_node
 class StructDeclaration(ASTNode):
     """Struct declaration: struct Name { properties... }"""
     name: str = ""
     properties: List[ASTNode] = field(default_factory=list)
 
 
-@dataclass
+@_node
 class MethodDeclaration(ASTNode):
     """Method declaration: method name(params) { body }"""
     name: str = ""
@@ -274,14 +292,14 @@ class MethodDeclaration(ASTNode):
     body: List[ASTNode] = field(default_factory=list)
 
 
-@dataclass
+@_node
 class MemberAccess(ASTNode):
     """Member access: object.property"""
     object: Optional[ASTNode] = None  # Identifier or nested MemberAccess
     member: str = ""
 
 
-@dataclass
+@_node
 class ArrayDeclaration(ASTNode):
     """Array declaration: int[] arr = [1, 2, 3]"""
     elem_type: str = ""  # int, float, etc.
@@ -290,20 +308,20 @@ class ArrayDeclaration(ASTNode):
     initializer: Optional[ASTNode] = None  # ArrayLiteral or None
 
 
-@dataclass
+@_node
 class ArrayLiteral(ASTNode):
     """Array literal: [1, 2, 3]"""
     elements: List[ASTNode] = field(default_factory=list)
 
 
-@dataclass
+@_node
 class ArrayAccess(ASTNode):
     """Array access: arr[index]"""
     array: Optional[ASTNode] = None  # Identifier or nested expression
     index: Optional[ASTNode] = None
 
 
-@dataclass
+@_node
 class ForLoop(ASTNode):
     """For loop: for (init; condition; increment) { body }"""
     init: Optional[ASTNode] = None
@@ -312,7 +330,7 @@ class ForLoop(ASTNode):
     body: List[ASTNode] = field(default_factory=list)
 
 
-@dataclass
+@_node
 class ForEachLoop(ASTNode):
     """Foreach loop: for (item in array) { body }"""
     var_type: str = ""
@@ -321,7 +339,7 @@ class ForEachLoop(ASTNode):
     body: List[ASTNode] = field(default_factory=list)
 
 
-@dataclass
+@_node
 class SwitchStatement(ASTNode):
     """Switch statement: switch (expr) { case...: ... }"""
     expression: Optional[ASTNode] = None
@@ -329,26 +347,26 @@ class SwitchStatement(ASTNode):
     default_case: Optional[ASTNode] = None  # DefaultCase node
 
 
-@dataclass
+@_node
 class CaseStatement(ASTNode):
     """Case statement: case value: statements..."""
     value: Optional[ASTNode] = None
     statements: List[ASTNode] = field(default_factory=list)
 
 
-@dataclass
+@_node
 class DefaultCase(ASTNode):
     """Default case: default: statements..."""
     statements: List[ASTNode] = field(default_factory=list)
 
 
-@dataclass
+@_node
 class BreakStatement(ASTNode):
     """Break statement: break;"""
     pass
 
 
-@dataclass
+@_node
 class TernaryExpression(ASTNode):
     """Ternary expression: condition ? true_val : false_val"""
     condition: Optional[ASTNode] = None
@@ -356,7 +374,7 @@ class TernaryExpression(ASTNode):
     false_value: Optional[ASTNode] = None
 
 
-@dataclass
+@_node
 class ConstDeclaration(ASTNode):
     """Const declaration: const int MAX = 100;"""
     var_type: str = ""
@@ -364,7 +382,7 @@ class ConstDeclaration(ASTNode):
     value: Optional[ASTNode] = None
 
 
-@dataclass
+@_node
 class EnumDeclaration(ASTNode):
     """Enum declaration: enum Name { A, B, C }"""
     name: str = ""
@@ -3,14 +3,47 @@ Command-line interface for ClearScript compiler.
 """
 
 import sys
+import mmap
 import argparse
+from functools import partial
 from pathlib import Path
 from .lexer import Lexer
 from .parser import Parser
 from .codegen import CodeGenerator
 
+# TypeChecker is imported on first use and kept here for later compiles
+_TypeChecker = None
 
-def compile_file(input_path: str, output_path: str = None, to_stdout: bool = False) -> bool:
+
+def read_source(input_path: str) -> str:
+    """
+    Read a ClearScript source file.
+    
+    The file is memory-mapped and decoded straight from the mapping, which
+    skips the text-mode reader's intermediate buffers. Newlines are
+    normalized the same way text mode would.
+    """
+    with open(input_path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Empty files and pipes cannot be mapped
+            source = f.read().decode('utf-8')
+        else:
+            # Decoded outside the try, so a UnicodeDecodeError (a
+            # ValueError) is not mistaken for an unmappable file
+            with mm:
+                source = str(mm, 'utf-8')
+    
+    if '\r' in source:
+        source = source.replace('\r\n', '\n').replace('\r', '\n')
+    return source
+
+
+def compile_file(input_path: str, output_path: str = None, to_stdout: bool = False,
+                 memoize: bool = False, keep_comments: bool = False,
+                 no_typecheck: bool = False, ast_cache: bool = False,
+                 fold_constants: bool = False) -> bool:
     """
     Compile a ClearScript file to StateScript.
     
@@ -18,27 +51,40 @@ def compile_file(input_path: str, output_path: str = None, to_stdout: bool = Fal
         input_path: Path to the .cst input file
         output_path: Path to the .ss output file (optional)
         to_stdout: If True, print to stdout instead of file
+        memoize: If True, enable parser memoization
+        keep_comments: If True, carry source comments into the output
+        no_typecheck: If True, skip type checking
+        ast_cache: If True, reuse ASTs cached on disk for unchanged sources
+        fold_constants: If True, evaluate arithmetic on numeric literals at parse time
     
     Returns:
         True if compilation succeeded, False otherwise
     """
+    global _TypeChecker
+    
     try:
         # Read input file
-        with open(input_path, 'r', encoding='utf-8') as f:
-            source = f.read()
-        
-        # Lexical analysis
-        lexer = Lexer(source)
-        tokens = lexer.tokenize()
+        source = read_source(input_path)
         
-        # Parsing
-        parser = Parser(tokens)
-        ast = parser.parse()
+        if ast_cache:
+            from .ast_cache import load_or_parse
+            ast = load_or_parse(source, memoize=memoize, keep_comments=keep_comments,
+                                fold_constants=fold_constants)
+        else:
+            # Lexical analysis
+            lexer = Lexer(source)
+            tokens = lexer.tokenize()
+            
+            # Parsing
+            parser = Parser(tokens, memoize=memoize, keep_comments=keep_comments,
+                            fold_constants=fold_constants)
+            ast = parser.parse()
         
         # Type check (unless disabled)
-        if not args.no_typecheck:
-            from .typechecker import TypeChecker
-            checker = TypeChecker(ast)
+        if not no_typecheck:
+            if _TypeChecker is None:
+                from .typechecker import TypeChecker as _TypeChecker
+            checker = _TypeChecker(ast)
             errors = checker.check()
             
             if errors:
@@ -76,6 +122,72 @@ def compile_file(input_path: str, output_path: str = None, to_stdout: bool = Fal
         return False
 
 
+def compile_batch(paths, memoize: bool = False, keep_comments: bool = False,
+                  no_typecheck: bool = False, jobs: int = 1, ast_cache: bool = False,
+                  fold_constants: bool = False) -> bool:
+    """
+    Compile several ClearScript files in a single process.
+    
+    The interpreter start-up and imports are paid once for the whole
+    batch instead of once per file. Paths are consumed lazily, so a build
+    tool can keep feeding them over a pipe.
+    
+    With jobs > 1 the files are spread over a process pool instead. Each
+    file is compiled whole by one worker, since codegen inside a file
+    shares its label counter across declarations. At most 2 * jobs files
+    are in flight at once, so paths are still read as workers free up
+    rather than all up front.
+    
+    Args:
+        paths: Iterable of .cst input paths (blank entries are skipped)
+        memoize: If True, enable parser memoization
+        keep_comments: If True, carry source comments into the output
+        no_typecheck: If True, skip type checking
+        jobs: Number of worker processes (1 compiles serially)
+        ast_cache: If True, reuse ASTs cached on disk for unchanged sources
+        fold_constants: If True, evaluate arithmetic on numeric literals at parse time
+    
+    Returns:
+        True if every file compiled, False otherwise
+    """
+    paths = (path.strip() for path in paths)
+    paths = (path for path in paths if path)
+    compile_one = partial(compile_file, memoize=memoize, keep_comments=keep_comments,
+                          no_typecheck=no_typecheck, ast_cache=ast_cache,
+                          fold_constants=fold_constants)
+    
+    if jobs > 1:
+        from collections import deque
+        from concurrent.futures import ProcessPoolExecutor
+        success = True
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            for path in paths:
+                # Bounded window: wait for the oldest file before reading on
+                if len(pending) >= 2 * jobs:
+                    if not pending.popleft().result():
+                        success = False
+                pending.append(executor.submit(compile_one, path))
+            for future in pending:
+                if not future.result():
+                    success = False
+        return success
+    
+    success = True
+    for path in paths:
+        if not compile_one(path):
+            success = False
+    return success
+
+
+def _job_count(value: str) -> int:
+    """argparse type for -j/--jobs: a positive number of worker processes."""
+    jobs = int(value)
+    if jobs < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {jobs}")
+    return jobs
+
+
 def main():
     """Main entry point for the CLI."""
     parser = argparse.ArgumentParser(
@@ -86,6 +198,8 @@ Examples:
   clearscript compile input.cst                 # Compile to input.ss
   clearscript compile input.cst -o output.ss    # Compile to specific output
   clearscript compile input.cst --stdout        # Print to stdout
+  ls *.cst | clearscript batch                  # Compile every file listed on stdin
+  ls *.cst | clearscript batch -j 4             # Same, using four worker processes
         """
     )
     
@@ -97,6 +211,26 @@ Examples:
     compile_parser.add_argument('-o', '--output', help='Output StateScript file (.ss)')
     compile_parser.add_argument('--stdout', action='store_true', help='Print to stdout instead of file')
     compile_parser.add_argument('--no-typecheck', action='store_true', help='Disable type checking')
+    compile_parser.add_argument('--memoize', action='store_true',
+                                help='Memoize parser results (helps only on backtracking-heavy input)')
+    compile_parser.add_argument('--keep-comments', action='store_true', help='Carry source comments into the output')
+    compile_parser.add_argument('--ast-cache', action='store_true',
+                                help='Reuse parsed ASTs cached under ~/.cache/clearscript for unchanged sources')
+    compile_parser.add_argument('--fold-constants', action='store_true',
+                                help='Evaluate +, - and * between number literals at compile time')
+    
+    # Batch command
+    batch_parser = subparsers.add_parser('batch', help='Compile every file listed on stdin (one path per line)')
+    batch_parser.add_argument('--no-typecheck', action='store_true', help='Disable type checking')
+    batch_parser.add_argument('--memoize', action='store_true',
+                              help='Memoize parser results (helps only on backtracking-heavy input)')
+    batch_parser.add_argument('--keep-comments', action='store_true', help='Carry source comments into the output')
+    batch_parser.add_argument('--ast-cache', action='store_true',
+                              help='Reuse parsed ASTs cached under ~/.cache/clearscript for unchanged sources')
+    batch_parser.add_argument('--fold-constants', action='store_true',
+                              help='Evaluate +, - and * between number literals at compile time')
+    batch_parser.add_argument('-j', '--jobs', type=_job_count, default=1,
+                              help='Compile files in this many worker processes (default: 1)')
     
     # Version command
     version_parser = subparsers.add_parser('version', help='Show version information')
@@ -105,7 +239,16 @@ Examples:
     
     # Handle commands
     if args.command == 'compile':
-        success = compile_file(args.input, args.output, args.stdout)
+        success = compile_file(args.input, args.output, args.stdout,
+                               memoize=args.memoize, keep_comments=args.keep_comments,
+                               no_typecheck=args.no_typecheck, ast_cache=args.ast_cache,
+                               fold_constants=args.fold_constants)
+        sys.exit(0 if success else 1)
+    
+    elif args.command == 'batch':
+        success = compile_batch(sys.stdin, memoize=args.memoize, keep_comments=args.keep_comments,
+                                no_typecheck=args.no_typecheck, jobs=args.jobs,
+                                ast_cache=args.ast_cache, fold_constants=args.fold_constants)
         sys.exit(0 if success else 1)
     
     elif args.command == 'version':
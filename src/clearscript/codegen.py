@@ -4,246 +4,334 @@ Code Generator for ClearScript
 Generates InfiltrationEngine StateScript from ClearScript AST.
 """
 
-from typing import List, Set
+import io
+import sys
+from functools import partial
+from typing import List, Optional, Set
 from .ast_nodes import *
 
 
+# Fixed output fragments, shared by every emitted line. Interned so that
+# every line reuses the same string objects
+_SP = " "
+_ZERO = "0"
+_LABEL = ":"
+_INIT = sys.intern("INIT ")
+_SET = sys.intern("SET ")
+_GOTO = sys.intern("GOTO ")
+_CALL = sys.intern("CALL ")
+_CALLIF = sys.intern("CALLIF ")
+_INC = sys.intern("INC ")
+_DEC = sys.intern("DEC ")
+_PUSH = sys.intern("PUSH ")
+_POP = sys.intern("POP ")
+_PEEK = sys.intern("PEEK ")
+_WAIT = sys.intern("WAIT ")
+_WAITFOR = sys.intern("WAITFOR {")
+_THREAD = sys.intern("THREAD ")
+_SPAWNBOT = sys.intern("SPAWNBOT ")
+_MOVETO = sys.intern("MOVETO ")
+_ANIMATE = sys.intern("ANIMATE ")
+_DELETE = sys.intern("DELETE ")
+_KILL = sys.intern("KILL")
+_RETURN = sys.intern("RETURN")
+_OPEN_COND = " {"
+_CLOSE_COND = "}"
+_STRING_TMPL = "[%s]"
+
+# Operand kinds for _EXPR_STMT_OPS: plain names that are left out when
+# empty, rendered expressions, or conditions the line already wraps in {}
+_NAME = 0
+_EXPR = 1
+_COND = 2
+
+# Builtin statement -> (line prefix, operands joined by spaces, line suffix)
+_EXPR_STMT_OPS = {
+    KillStatement: (_KILL, (), ""),
+    WaitStatement: (_WAIT, (("time", _EXPR), ("result_var", _NAME)), ""),
+    WaitForStatement: (_WAITFOR, (("condition", _COND),), _CLOSE_COND),
+    SetStatement: (_SET, (("variable", _NAME), ("value", _EXPR)), ""),
+    PushStatement: (_PUSH, (("value", _EXPR),), ""),
+    PopStatement: (_POP, (("variable", _NAME),), ""),
+    PeekStatement: (_PEEK, (("variable", _NAME),), ""),
+    MoveToCall: (_MOVETO, (("prop", _EXPR), ("location", _EXPR)), ""),
+    AnimateCall: (_ANIMATE, (("prop", _EXPR), ("location", _EXPR), ("time", _EXPR)), ""),
+    DeleteCall: (_DELETE, (("prop", _EXPR),), ""),
+}
+
+# Declarations that only describe data layout and generate no code
+_TEMPLATE_DECLS = frozenset({ClassDeclaration, StructDeclaration})
+
+# Expressions that render wrapped in {}
+_SELF_WRAPPED = frozenset({BinaryOp, UnaryOp})
+
+# Comparison operator -> its logical negation
+_NEG = {"==": "!=", "!=": "==", "<": ">=", ">": "<=", "<=": ">", ">=": "<"}
+
+# %-format templates built on first use, keyed by operator or label prefix
+_BINOP_TMPL = {}
+_LABEL_FMT = {}
+_UNARY_TMPL = {}
+
+
+def _binop_template(op: str) -> str:
+    """Return the cached "{%s op %s}" template for a binary operator."""
+    tmpl = _BINOP_TMPL.get(op)
+    if tmpl is None:
+        # Wrap in {} for StateScript expression
+        tmpl = _BINOP_TMPL[op] = "{%s " + op.replace("%", "%%") + " %s}"
+    return tmpl
+
+
 class CodeGenerator:
     """Generates StateScript code from ClearScript AST."""
     
     def __init__(self, ast: Program):
         """Initialize the code generator."""
         self.ast = ast
-        self.output = []
+        self._buf = io.StringIO()
+        self._write = self._buf.write
+        self._work = []  # Pending nodes and lines, see visit()
         self.label_counter = 0
         self.init_statements = []  # Top-level INIT statements
         self.function_labels = {}  # Map function names to labels
-        
+        # id(node) -> (node, rendered expression); only set during generate()
+        self._expr_cache = None
+    
+    def emitln(self, *parts: str):
+        """Write the given fragments to the output as one line."""
+        write = self._write
+        for part in parts:
+            write(part)
+        write("\n")
+    
     def generate_label(self, prefix: str = "label") -> str:
         """Generate a unique label."""
         self.label_counter += 1
-        return f"_{prefix}_{self.label_counter}"
+        fmt = _LABEL_FMT.get(prefix)
+        if fmt is None:
+            fmt = _LABEL_FMT[prefix] = "_" + prefix.replace("%", "%%") + "_%d"
+        return fmt % self.label_counter
     
     def generate(self) -> str:
         """Generate StateScript code from the AST."""
-        self.output = []
+        # Rendered expressions are shared for this run only, so a later
+        # direct expression_to_string() call never sees stale text
+        self._expr_cache = {}
+        try:
+            return self._generate()
+        finally:
+            self._expr_cache = None
+    
+    def _generate(self) -> str:
+        """Emit the whole program; see generate()."""
+        visit = self.visit
+        emitln = self.emitln
+        self._buf = io.StringIO()
+        self._write = self._buf.write
+        self._work = []
         self.init_statements = []
         self.label_counter = 0
         
-        # First pass: collect functions and top-level variable declarations
+        # Single pass: collect functions and main code, emitting top-level
+        # variable declarations as INIT as they are met
         functions = []
         main_statements = []
+        function_append = functions.append
+        main_append = main_statements.append
+        init_append = self.init_statements.append
+        init_emit = self.visit_init_declaration
+        function_labels = self.function_labels
         
         for stmt in self.ast.statements:
-            if isinstance(stmt, FunctionDeclaration):
-                functions.append(stmt)
-                self.function_labels[stmt.name] = stmt.name
-            elif isinstance(stmt, VariableDeclaration):
-                # Top-level variables become INIT
-                self.init_statements.append(stmt)
-            else:
-                main_statements.append(stmt)
-        
-        # Output INIT statements first
-        for init in self.init_statements:
-            self.visit_init_declaration(init)
+            stmt_type = type(stmt)
+            if stmt_type is FunctionDeclaration:
+                function_append(stmt)
+                function_labels[stmt.name] = stmt.name
+            elif stmt_type is VariableDeclaration:
+                init_append(stmt)
+                init_emit(stmt)
+            elif stmt_type not in _TEMPLATE_DECLS:
+                main_append(stmt)
         
         # Add blank line after INITs if we have main code
         if self.init_statements and (main_statements or functions):
-            self.output.append("")
+            emitln()
         
         # Skip to main code
         if main_statements:
-            self.output.append("GOTO _main")
-            self.output.append("")
+            emitln("GOTO _main")
+            emitln()
         
         # Output functions as labels
         for func in functions:
-            self.visit_function_declaration(func)
-            self.output.append("")
+            visit(func)
+            emitln()
         
         # Output main code
         if main_statements:
-            self.output.append(":_main")
+            emitln(":_main")
             for stmt in main_statements:
-                self.visit(stmt)
+                visit(stmt)
         
-        return '\n'.join(self.output)
+        # Lines are newline-terminated; the program text is not
+        return self._buf.getvalue()[:-1]
     
     def visit_init_declaration(self, node: VariableDeclaration):
         """Generate: INIT x 5"""
-        if node.value:
-            value_str = self.expression_to_string(node.value)
-            self.output.append(f"INIT {node.name} {value_str}")
-        else:
-            self.output.append(f"INIT {node.name} 0")
+        self._emit_set(_INIT, node.name, node.value)
     
     def visit_function_declaration(self, node: FunctionDeclaration):
         """Generate label and function body with POP for parameters."""
-        self.output.append(f":{node.name}")
-        
-        # POP parameters in reverse order (stack semantics)
-        for param in reversed(node.params):
-            self.output.append(f"POP {param}")
+        emitln = self.emitln
+        emitln(_LABEL, node.name)
         
-        # Generate function body
-        for stmt in node.body:
-            self.visit(stmt)
+        # POP parameters in reverse order (stack semantics), as one block
+        if node.params:
+            emitln("\n".join([_POP + param for param in reversed(node.params)]))
         
-        # Add RETURN if not already present
+        # Generate function body, adding RETURN if not already present
+        items = list(node.body)
         if not node.body or not isinstance(node.body[-1], ReturnStatement):
-            self.output.append("RETURN")
+            items.append(_RETURN)
+        self._schedule(items)
     
     def visit(self, node: ASTNode):
-        """Dispatch to the appropriate visitor method."""
-        if isinstance(node, VariableDeclaration):
-            self.visit_variable_declaration(node)
-        elif isinstance(node, ArrayDeclaration):
-            self.visit_array_declaration(node)
-        elif isinstance(node, Assignment):
-            self.visit_assignment(node)
-        elif isinstance(node, FunctionDeclaration):
-            self.visit_function_declaration(node)
-        elif isinstance(node, ClassDeclaration):
-            self.visit_class_declaration(node)
-        elif isinstance(node, StructDeclaration):
-            self.visit_struct_declaration(node)
-        elif isinstance(node, LabelDeclaration):
-            self.visit_label_declaration(node)
-        elif isinstance(node, GotoStatement):
-            self.visit_goto_statement(node)
-        elif isinstance(node, IfStatement):
-            self.visit_if_statement(node)
-        elif isinstance(node, WhileStatement):
-            self.visit_while_statement(node)
-        elif isinstance(node, ForLoop):
-            self.visit_for_loop(node)
-        elif isinstance(node, SwitchStatement):
-            self.visit_switch_statement(node)
-        elif isinstance(node, ConstDeclaration):
-            self.visit_const_declaration(node)
-        elif isinstance(node, ReturnStatement):
-            self.visit_return_statement(node)
-        elif isinstance(node, ExpressionStatement):
-            self.visit_expression_statement(node)
-        elif isinstance(node, RawBlock):
-            self.visit_raw_block(node)
-        elif isinstance(node, Comment):
-            self.visit_comment(node)
-        else:
-            raise ValueError(f"Unknown node type: {type(node)}")
+        """
+        Generate a node and everything it schedules.
+        
+        Visitors with bodies emit their opening lines directly and push the
+        rest (child nodes and closing lines) onto a shared work stack, so
+        nesting depth costs no Python stack frames. Each call drains only
+        the items pushed above its own starting point.
+        """
+        work = self._work
+        base = len(work)
+        work.append(node)
+        dispatch = self._DISPATCH
+        write = self._write
+        while len(work) > base:
+            item = work.pop()
+            item_type = type(item)
+            if item_type is str:
+                write(item)
+                write("\n")
+                continue
+            visitor = dispatch.get(item_type)
+            if visitor is None:
+                raise ValueError(f"Unknown node type: {item_type}")
+            visitor(self, item)
+    
+    def _schedule(self, items: list):
+        """Queue nodes and finished lines to be generated in order."""
+        self._work.extend(reversed(items))
+    
+    def _run_deferred(self, step: partial):
+        """Run a step that had to wait for earlier output (e.g. label numbering)."""
+        step()
+    
+    def visit_empty(self, node: None):
+        """Generate nothing for a missing node."""
+        pass
     
     def visit_variable_declaration(self, node: VariableDeclaration):
         """Generate: SET x 5 (for non-top-level variables)"""
-        if node.value:
-            value_str = self.expression_to_string(node.value)
-            self.output.append(f"SET {node.name} {value_str}")
-        else:
-            self.output.append(f"SET {node.name} 0")
+        self._emit_set(_SET, node.name, node.value)
+    
+    def _emit_set(self, opcode: str, name: str, value: Optional[ASTNode]):
+        """Emit an INIT/SET line, defaulting a missing value to 0."""
+        value_str = _ZERO if value is None else self.expression_to_string(value)
+        self.emitln(opcode, name, _SP, value_str)
     
     def visit_array_declaration(self, node: ArrayDeclaration):
         """Generate array as indexed variables: arr_0, arr_1, arr_2, etc."""
         if node.initializer and isinstance(node.initializer, ArrayLiteral):
-            # Generate indexed variables for each element
-            for i, elem in enumerate(node.initializer.elements):
-                value_str = self.expression_to_string(elem)
-                self.output.append(f"SET {node.name}_{i} {value_str}")
-            # Store array length
-            self.output.append(f"SET {node.name}_length {len(node.initializer.elements)}")
+            # Generate indexed variables for each element, then the length,
+            # as one block
+            e = self.expression_to_string
+            name = node.name
+            elems = node.initializer.elements
+            lines = ["SET %s_%d %s" % (name, i, e(elem)) for i, elem in enumerate(elems)]
+            lines.append("SET %s_length %d" % (name, len(elems)))
+            self.emitln("\n".join(lines))
         else:
             # No initializer, just set length to 0
-            self.output.append(f"SET {node.name}_length 0")
+            self.emitln(_SET, node.name, "_length 0")
     
     def visit_assignment(self, node: Assignment):
         """Generate: SET x value"""
         value_str = self.expression_to_string(node.value)
-        self.output.append(f"SET {node.target} {value_str}")
+        self.emitln(_SET, node.target, _SP, value_str)
     
     def visit_member_assignment(self, object_name: str, member_name: str, value):
         """Handle member assignment: obj.prop = value -> obj_prop = value"""
         value_str = self.expression_to_string(value)
-        self.output.append(f"SET {object_name}_{member_name} {value_str}")
+        self.emitln(_SET, object_name, "_", member_name, _SP, value_str)
     
     def visit_label_declaration(self, node: LabelDeclaration):
         """Generate: :labelname"""
-        self.output.append(f":{node.name}")
+        self.emitln(_LABEL, node.name)
     
     def visit_goto_statement(self, node: GotoStatement):
         """Generate: GOTO label or GOTO label {condition}"""
         if node.condition:
-            cond_str = self.expression_to_string(node.condition)
-            self.output.append(f"GOTO {node.label} {{{cond_str}}}")
+            cond_str = self.expression_to_string(node.condition, top_level=True)
+            self.emitln(_GOTO, node.label, _OPEN_COND, cond_str, _CLOSE_COND)
         else:
-            self.output.append(f"GOTO {node.label}")
+            self.emitln(_GOTO, node.label)
     
     def visit_if_statement(self, node: IfStatement):
         """Generate if/else using CALLIF pattern."""
+        emitln = self.emitln
         then_label = self.generate_label("if_then")
         end_label = self.generate_label("if_end")
         
-        cond_str = self.expression_to_string(node.condition)
+        cond_str = self.expression_to_string(node.condition, top_level=True)
         
         if node.else_body:
             else_label = self.generate_label("if_else")
             
             # CALLIF for then branch
-            self.output.append(f"CALLIF {then_label} {{{cond_str}}}")
+            emitln(_CALLIF, then_label, _OPEN_COND, cond_str, _CLOSE_COND)
             # CALL for else branch
-            self.output.append(f"CALL {else_label}")
-            self.output.append(f"GOTO {end_label}")
-            
-            # Then branch
-            self.output.append(f":{then_label}")
-            for stmt in node.then_body:
-                self.visit(stmt)
-            self.output.append("RETURN")
-            
-            # Else branch
-            self.output.append(f":{else_label}")
-            for stmt in node.else_body:
-                self.visit(stmt)
-            self.output.append("RETURN")
+            emitln(_CALL, else_label)
+            emitln(_GOTO, end_label)
             
-            # End label
-            self.output.append(f":{end_label}")
+            # Then branch, else branch, end label
+            emitln(_LABEL, then_label)
+            self._schedule([
+                *node.then_body, _RETURN,
+                _LABEL + else_label, *node.else_body, _RETURN,
+                _LABEL + end_label,
+            ])
         else:
             # Just CALLIF for then branch
-            self.output.append(f"CALLIF {then_label} {{{cond_str}}}")
-            self.output.append(f"GOTO {end_label}")
+            emitln(_CALLIF, then_label, _OPEN_COND, cond_str, _CLOSE_COND)
+            emitln(_GOTO, end_label)
             
-            # Then branch
-            self.output.append(f":{then_label}")
-            for stmt in node.then_body:
-                self.visit(stmt)
-            self.output.append("RETURN")
-            
-            # End label
-            self.output.append(f":{end_label}")
+            # Then branch, end label
+            emitln(_LABEL, then_label)
+            self._schedule([*node.then_body, _RETURN, _LABEL + end_label])
     
     def visit_while_statement(self, node: WhileStatement):
         """Generate while loop using GOTO pattern."""
+        emitln = self.emitln
         loop_label = self.generate_label("while")
         end_label = self.generate_label("while_end")
         
-        cond_str = self.expression_to_string(node.condition)
+        exit_cond = self.negated_condition(node.condition)
         
         # Loop start
-        self.output.append(f":{loop_label}")
+        emitln(_LABEL, loop_label)
         # Exit if condition is false
-        self.output.append(f"GOTO {end_label} {{!({cond_str})}}")
+        emitln(_GOTO, end_label, _SP, exit_cond)
         
-        # Loop body
-        for stmt in node.body:
-            self.visit(stmt)
-        
-        # Jump back to start
-        self.output.append(f"GOTO {loop_label}")
-        
-        # End label
-        self.output.append(f":{end_label}")
+        # Loop body, jump back to start, end label
+        self._schedule([*node.body, _GOTO + loop_label, _LABEL + end_label])
     
     def visit_for_loop(self, node: ForLoop):
         """Generate for loop as while loop: for(init; cond; inc) -> init; while(cond){body; inc}"""
+        emitln = self.emitln
         # Generate init statement
         if node.init:
             if isinstance(node.init, VariableDeclaration):
@@ -251,86 +339,80 @@ class CodeGenerator:
             else:
                 # It's an expression/assignment
                 expr_str = self.expression_to_string(node.init)
-                self.output.append(expr_str)
+                emitln(expr_str)
         
         # Generate while loop
         loop_label = self.generate_label("for")
         end_label = self.generate_label("for_end")
         
         # Loop start
-        self.output.append(f":{loop_label}")
+        emitln(_LABEL, loop_label)
         
         # Exit if condition is false
         if node.condition:
-            cond_str = self.expression_to_string(node.condition)
-            self.output.append(f"GOTO {end_label} {{!({cond_str})}}")
+            exit_cond = self.negated_condition(node.condition)
+            emitln(_GOTO, end_label, _SP, exit_cond)
         
         # Loop body
-        for stmt in node.body:
-            self.visit(stmt)
+        items = list(node.body)
         
         # Increment
-        if node.increment:
-            if isinstance(node.increment, UnaryOp) and node.increment.operator in ['++', '--']:
-                # Handle increment/decrement specially
-                operand_str = self.expression_to_string(node.increment.operand)
-                if node.increment.operator == '++':
-                    self.output.append(f"INC {operand_str}")
-                else:
-                    self.output.append(f"DEC {operand_str}")
-            else:
-                # Generic expression
-                expr_str = self.expression_to_string(node.increment)
-                if '=' in str(type(node.increment)):
-                    # It's an assignment
-                    self.output.append(expr_str)
-                else:
-                    # Evaluate expression (probably assignment inside)
-                    pass
-        
-        # Jump back to start
-        self.output.append(f"GOTO {loop_label}")
-        
-        # End label
-        self.output.append(f":{end_label}")
+        increment = node.increment
+        if isinstance(increment, UnaryOp) and increment.operator in ['++', '--']:
+            # Handle increment/decrement specially
+            items.append(self._inc_dec_line(increment))
+        elif isinstance(increment, Assignment):
+            value_str = self.expression_to_string(increment.value)
+            items.append(_SET + increment.target + _SP + value_str)
+        
+        # Jump back to start, end label
+        items.append(_GOTO + loop_label)
+        items.append(_LABEL + end_label)
+        self._schedule(items)
+    
+    def _inc_dec_line(self, node: UnaryOp) -> str:
+        """Generate: INC x or DEC x"""
+        opcode = _INC if node.operator == '++' else _DEC
+        return opcode + self.expression_to_string(node.operand)
     
     def visit_switch_statement(self, node: SwitchStatement):
         """Generate switch as if-else chain"""
         expr_str = self.expression_to_string(node.expression)
         end_label = self.generate_label("switch_end")
         
-        # Generate if-else chain for cases
-        for i, case in enumerate(node.cases):
-            case_label = self.generate_label(f"case")
-            next_label = self.generate_label(f"case_check")
-            
-            # Check if expression matches case value
-            case_value_str = self.expression_to_string(case.value)
-            self.output.append(f"CALLIF {case_label} {{{expr_str} == {case_value_str}}}")
-            self.output.append(f"GOTO {next_label}")
-            
-            # Case body
-            self.output.append(f":{case_label}")
-            for stmt in case.statements:
-                self.visit(stmt)
-            self.output.append(f"GOTO {end_label}")
-            
-            # Next case check
-            self.output.append(f":{next_label}")
+        # Every case check compares against the same expression
+        cond_prefix = _OPEN_COND + expr_str + " == "
         
-            for stmt in node.default_case.statements:
-                self.visit(stmt)
+        # Generate if-else chain for cases. Each case numbers its labels only
+        # once the previous case body has been generated.
+        items = [partial(self._switch_case, case, cond_prefix, end_label) for case in node.cases]
+        
+        # Falls through to the default body when no case matched
+        if node.default_case:
+            items.extend(node.default_case.statements)
         
         # End label
-        self.output.append(f":{end_label}")
+        items.append(_LABEL + end_label)
+        self._schedule(items)
+    
+    def _switch_case(self, case: CaseStatement, cond_prefix: str, end_label: str):
+        """Generate one case of a switch chain."""
+        emitln = self.emitln
+        case_label = self.generate_label(f"case")
+        next_label = self.generate_label(f"case_check")
+        
+        # Check if expression matches case value
+        case_value_str = self.expression_to_string(case.value)
+        emitln(_CALLIF, case_label, cond_prefix, case_value_str, _CLOSE_COND)
+        emitln(_GOTO, next_label)
+        
+        # Case body, then the next case check
+        emitln(_LABEL, case_label)
+        self._schedule([*case.statements, _GOTO + end_label, _LABEL + next_label])
     
     def visit_const_declaration(self, node: ConstDeclaration):
         """Generate const as regular variable (StateScript doesn't have const)"""
-        if node.value:
-            value_str = self.expression_to_string(node.value)
-            self.output.append(f"SET {node.name} {value_str}")
-        else:
-            self.output.append(f"SET {node.name} 0")
+        self._emit_set(_SET, node.name, node.value)
     
     def visit_class_declaration(self, node: ClassDeclaration):
         """
@@ -352,177 +434,279 @@ class CodeGenerator:
     
     def visit_return_statement(self, node: ReturnStatement):
         """Generate: RETURN"""
-        self.output.append("RETURN")
+        self.emitln(_RETURN)
+    
+    def visit_command(self, node: ASTNode):
+        """Generate a builtin that is an opcode followed by its operands."""
+        e = self.expression_to_string
+        prefix, operands, suffix = _EXPR_STMT_OPS[type(node)]
+        parts = []
+        for name, kind in operands:
+            value = getattr(node, name)
+            if kind:
+                parts.append(e(value, kind == _COND))
+            elif value:
+                parts.append(value)
+        self.emitln(prefix, " ".join(parts), suffix)
+    
+    def visit_thread_statement(self, node: ThreadStatement):
+        """Generate: THREAD label args..."""
+        e = self.expression_to_string
+        args_str = " ".join([e(arg) for arg in node.args])
+        if args_str:
+            self.emitln(_THREAD, node.label, _SP, args_str)
+        else:
+            self.emitln(_THREAD, node.label)
+    
+    def visit_spawnbot_call(self, node: SpawnBotCall):
+        """Generate: SPAWNBOT template location attributes..."""
+        e = self.expression_to_string
+        template_str = e(node.template)
+        location_str = e(node.location)
+        attrs_str = " ".join([e(attr) for attr in node.attributes])
+        if attrs_str:
+            self.emitln(_SPAWNBOT, template_str, _SP, location_str, _SP, attrs_str)
+        else:
+            self.emitln(_SPAWNBOT, template_str, _SP, location_str)
     
     def visit_expression_statement(self, node: ExpressionStatement):
         """Generate expression statement."""
+        emitln = self.emitln
+        e = self.expression_to_string
         expr = node.expression
         
-        # Handle special expressions that become statements
-        if isinstance(expr, KillStatement):
-            self.output.append("KILL")
-        elif isinstance(expr, WaitStatement):
-            time_str = self.expression_to_string(expr.time)
-            if expr.result_var:
-                self.output.append(f"WAIT {time_str} {expr.result_var}")
-            else:
-                self.output.append(f"WAIT {time_str}")
-        elif isinstance(expr, WaitForStatement):
-            cond_str = self.expression_to_string(expr.condition)
-            self.output.append(f"WAITFOR {{{cond_str}}}")
-        elif isinstance(expr, ThreadStatement):
-            args_str = " ".join(self.expression_to_string(arg) for arg in expr.args)
-            if args_str:
-                self.output.append(f"THREAD {expr.label} {args_str}")
-            else:
-                self.output.append(f"THREAD {expr.label}")
-        elif isinstance(expr, SetStatement):
-            value_str = self.expression_to_string(expr.value)
-            self.output.append(f"SET {expr.variable} {value_str}")
-        elif isinstance(expr, PushStatement):
-            value_str = self.expression_to_string(expr.value)
-            self.output.append(f"PUSH {value_str}")
-        elif isinstance(expr, PopStatement):
-            self.output.append(f"POP {expr.variable}")
-        elif isinstance(expr, PeekStatement):
-            self.output.append(f"PEEK {expr.variable}")
-        elif isinstance(expr, SpawnBotCall):
-            template_str = self.expression_to_string(expr.template)
-            location_str = self.expression_to_string(expr.location)
-            attrs_str = " ".join(self.expression_to_string(attr) for attr in expr.attributes)
-            if attrs_str:
-                self.output.append(f"SPAWNBOT {template_str} {location_str} {attrs_str}")
-            else:
-                self.output.append(f"SPAWNBOT {template_str} {location_str}")
-        elif isinstance(expr, MoveToCall):
-            prop_str = self.expression_to_string(expr.prop)
-            location_str = self.expression_to_string(expr.location)
-            self.output.append(f"MOVETO {prop_str} {location_str}")
-        elif isinstance(expr, AnimateCall):
-            prop_str = self.expression_to_string(expr.prop)
-            location_str = self.expression_to_string(expr.location)
-            time_str = self.expression_to_string(expr.time)
-            self.output.append(f"ANIMATE {prop_str} {location_str} {time_str}")
-        elif isinstance(expr, DeleteCall):
-            prop_str = self.expression_to_string(expr.prop)
-            self.output.append(f"DELETE {prop_str}")
+        # Builtin commands are normally statements of their own, but ASTs
+        # built by hand may still wrap them
+        command = self._COMMAND_VISITORS.get(type(expr))
+        if command is not None:
+            command(self, expr)
+        
+        # Handle the remaining special expressions that become statements
         elif isinstance(expr, UnaryOp):
             # Handle increment/decrement as statements
             if expr.operator in ['++', '--']:
-                operand_str = self.expression_to_string(expr.operand)
-                if expr.operator == '++':
-                    self.output.append(f"INC {operand_str}")
-                else:
-                    self.output.append(f"DEC {operand_str}")
+                emitln(self._inc_dec_line(expr))
             else:
                 # Other unary ops as expressions
-                expr_str = self.expression_to_string(expr)
-                self.output.append(expr_str)
+                expr_str = e(expr)
+                emitln(expr_str)
         elif isinstance(expr, Assignment):
             # Assignment as statement
-            value_str = self.expression_to_string(expr.value)
-            self.output.append(f"SET {expr.target} {value_str}")
+            value_str = e(expr.value)
+            emitln(_SET, expr.target, _SP, value_str)
         elif isinstance(expr, FunctionCall):
             # User function call - generate PUSH for each arg in reverse, then CALL
             for arg in reversed(expr.args):
-                arg_str = self.expression_to_string(arg)
-                self.output.append(f"PUSH {arg_str}")
-            self.output.append(f"CALL {expr.name}")
+                arg_str = e(arg)
+                emitln(_PUSH, arg_str)
+            emitln(_CALL, expr.name)
         else:
             # Generic expression statement
-            expr_str = self.expression_to_string(expr)
-            self.output.append(expr_str)
+            expr_str = e(expr)
+            emitln(expr_str)
     
     def visit_raw_block(self, node: RawBlock):
         """Output raw StateScript code directly."""
         if node.code:
-            self.output.append(node.code)
+            self.emitln(node.code)
     
     def visit_comment(self, node: Comment):
         """Generate comment."""
         if node.is_block:
-            self.output.append(f"/* {node.text} */")
+            self.emitln("/* ", node.text, " */")
         else:
-            self.output.append(f"// {node.text}")
+            self.emitln("// ", node.text)
     
-    def expression_to_string(self, node: ASTNode) -> str:
-        """Convert an expression node to a string with proper StateScript formatting."""
-        if node is None:
-            return ""
+    def expression_to_string(self, node: ASTNode, top_level: bool = False) -> str:
+        """
+        Convert an expression node to a string with proper StateScript formatting.
+        
+        Args:
+            node: Expression to render
+            top_level: If True, the caller wraps the result in {} itself, so
+                operators are rendered without their own braces
         
-        if isinstance(node, Literal):
+        Returns:
+            StateScript expression text
+        """
+        # Leaves make up most operands, so handle them before the table lookup
+        node_type = type(node)
+        if node_type is Identifier:
+            return node.name
+        if node_type is Literal:
+            # Rendered once per node per run, through the expression cache
+            cache = self._expr_cache
+            if cache is not None:
+                entry = cache.get(id(node))
+                if entry is not None:
+                    return entry[1]
             if node.literal_type == 'string':
                 # String literals wrapped in []
-                return f"[{node.value}]"
+                rendered = _STRING_TMPL % node.value
             else:
-                return str(node.value)
-        
-        elif isinstance(node, Identifier):
-            return node.name
-        
-        elif isinstance(node, ArrayAccess):
-            # Array access: arr[i] becomes arr_i if index is constant, or dynamic lookup
-            if isinstance(node.array, Identifier):
-                array_name = node.array.name
-                # Try to get constant index
-                if isinstance(node.index, Literal):
-                    index_val = node.index.value
-                    return f"{array_name}_{index_val}"
-                elif isinstance(node.index, Identifier):
-                    # Dynamic index - use variable name as suffix
-                    index_name = node.index.name
-                    # This is a limitation: StateScript doesn't support dynamic indexing
-                    # We'll use a computed variable name pattern
-                    return f"{{${array_name}_{{{index_name}}}}}"
-                else:
-                    # Complex expression as index
-                    return f"{array_name}_0"  # Fallback
-            return "unknown_array"
-        
-        elif isinstance(node, TernaryExpression):
-            # Ternary not directly supported in expressions, convert to if-else conceptually
-            # For now, just return a placeholder - proper support needs statement context
-            cond_str = self.expression_to_string(node.condition)
-            true_str = self.expression_to_string(node.true_value)
-            false_str = self.expression_to_string(node.false_value)
-            # Use inline conditional syntax if StateScript supports it, otherwise limitation
-            return f"({cond_str} ? {true_str} : {false_str})"  # Placeholder
-        
-        elif isinstance(node, MemberAccess):
-            # Member access: obj.property becomes obj_property
-            if isinstance(node.object, Identifier):
-                obj_name = node.object.name
-                return f"{obj_name}_{node.member}"
-            elif isinstance(node.object, MemberAccess):
-                # Nested member access: obj.prop1.prop2
-                obj_str = self.expression_to_string(node.object)
-                return f"{obj_str}_{node.member}"
+                rendered = str(node.value)
+            if cache is not None:
+                cache[id(node)] = (node, rendered)
+            return rendered
+        
+        if top_level and node_type in _SELF_WRAPPED:
+            # Render as usual (sharing the memo), then drop the outer braces
+            return self.expression_to_string(node)[1:-1]
+        
+        handler = self._EXPR_DISPATCH.get(node_type)
+        if handler is None:
+            raise ValueError(f"Cannot convert {node_type} to expression string")
+        cache = self._expr_cache
+        if cache is None or node_type not in self._CACHED_EXPRS:
+            return handler(self, node)
+        
+        # The AST is not mutated during generation. Each entry also holds
+        # its node, so the id() key cannot be reused by another object.
+        key = id(node)
+        entry = cache.get(key)
+        if entry is None:
+            entry = cache[key] = (node, handler(self, node))
+        return entry[1]
+    
+    def _expr_empty(self, node: None) -> str:
+        """A missing expression renders as nothing."""
+        return ""
+    
+    def _expr_array_access(self, node: ArrayAccess) -> str:
+        """Generate: arr_0"""
+        # Array access: arr[i] becomes arr_i if index is constant, or dynamic lookup
+        if isinstance(node.array, Identifier):
+            array_name = node.array.name
+            # Try to get constant index
+            if isinstance(node.index, Literal):
+                index_val = node.index.value
+                return f"{array_name}_{index_val}"
+            elif isinstance(node.index, Identifier):
+                # Dynamic index - use variable name as suffix
+                index_name = node.index.name
+                # This is a limitation: StateScript doesn't support dynamic indexing
+                # We'll use a computed variable name pattern
+                return f"{{${array_name}_{{{index_name}}}}}"
             else:
-                return f"unknown_{node.member}"
-        
-        elif isinstance(node, FunctionCall):
-            # Function calls in expression context are tricky
-            # For now, just return the name - they should be statements
-            # If needed in expression, would need temp variable
-            return f"/* CALL {node.name} */"
-        
-        elif isinstance(node, BinaryOp):
-            left = self.expression_to_string(node.left)
-            right = self.expression_to_string(node.right)
-            # Wrap in {} for StateScript expression
-            return f"{{{left} {node.operator} {right}}}"
+                # Complex expression as index
+                return f"{array_name}_0"  # Fallback
+        return "unknown_array"
+    
+    def _expr_ternary(self, node: TernaryExpression) -> str:
+        """Generate: (cond ? a : b)"""
+        e = self.expression_to_string
+        # Ternary not directly supported in expressions, convert to if-else conceptually
+        # For now, just return a placeholder - proper support needs statement context
+        cond_str = e(node.condition)
+        true_str = e(node.true_value)
+        false_str = e(node.false_value)
+        # Use inline conditional syntax if StateScript supports it, otherwise limitation
+        return f"({cond_str} ? {true_str} : {false_str})"  # Placeholder
+    
+    def _expr_member_access(self, node: MemberAccess) -> str:
+        """Generate: obj_member"""
+        # Member access: obj.prop1.prop2 becomes obj_prop1_prop2. Walk the
+        # chain once and join, rather than building each prefix in turn
+        parts = [node.member]
+        obj = node.object
+        while type(obj) is MemberAccess:
+            parts.append(obj.member)
+            obj = obj.object
+        if type(obj) is Identifier:
+            parts.append(obj.name)
+        else:
+            parts.append("unknown")
+        parts.reverse()
+        return "_".join(parts)
+    
+    def _expr_function_call(self, node: FunctionCall) -> str:
+        """Generate a placeholder for a call used as a value."""
+        # Function calls in expression context are tricky
+        # For now, just return the name - they should be statements
+        # If needed in expression, would need temp variable
+        return f"/* CALL {node.name} */"
+    
+    def _expr_binary_op(self, node: BinaryOp) -> str:
+        """Generate: {a + b}"""
+        e = self.expression_to_string
+        return _binop_template(node.operator) % (e(node.left), e(node.right))
+    
+    def negated_condition(self, node: ASTNode) -> str:
+        """
+        Render the logical negation of a condition as a {...} expression.
         
-        elif isinstance(node, UnaryOp):
+        Comparisons are flipped and a leading '!' is dropped rather than
+        wrapping the whole condition in {!(...)}.
+        """
+        node_type = type(node)
+        if node_type is BinaryOp and node.operator in _NEG:
+            e = self.expression_to_string
+            return _binop_template(_NEG[node.operator]) % (e(node.left), e(node.right))
+        if node_type is UnaryOp and node.operator == '!' and not node.is_postfix:
             operand = self.expression_to_string(node.operand)
-            if node.is_postfix:
-                return f"{{{operand}{node.operator}}}"
-            else:
-                return f"{{{node.operator}{operand}}}"
-        
-        elif isinstance(node, Assignment):
-            # Assignment in expression context is unusual but handle it
-            value = self.expression_to_string(node.value)
-            return f"{node.target} = {value}"
-        
-        else:
-            raise ValueError(f"Cannot convert {type(node)} to expression string")
+            return operand if operand.startswith("{") else "{" + operand + "}"
+        return "{!(" + self.expression_to_string(node, top_level=True) + ")}"
+    
+    def _expr_unary_op(self, node: UnaryOp) -> str:
+        """Generate: {-a} or {a++}"""
+        key = (node.operator, node.is_postfix)
+        tmpl = _UNARY_TMPL.get(key)
+        if tmpl is None:
+            op = node.operator.replace("%", "%%")
+            tmpl = "{%s" + op + "}" if node.is_postfix else "{" + op + "%s}"
+            _UNARY_TMPL[key] = tmpl
+        return tmpl % self.expression_to_string(node.operand)
+    
+    def _expr_assignment(self, node: Assignment) -> str:
+        """Generate: x = value"""
+        # Assignment in expression context is unusual but handle it
+        value = self.expression_to_string(node.value)
+        return f"{node.target} = {value}"
+    
+    # Builtin commands, which the parser emits as statements of their own
+    _COMMAND_VISITORS = {
+        **dict.fromkeys(_EXPR_STMT_OPS, visit_command),
+        ThreadStatement: visit_thread_statement,
+        SpawnBotCall: visit_spawnbot_call,
+    }
+    
+    # Statement visitors keyed by exact node class; built once per class
+    _DISPATCH = {
+        VariableDeclaration: visit_variable_declaration,
+        ArrayDeclaration: visit_array_declaration,
+        Assignment: visit_assignment,
+        FunctionDeclaration: visit_function_declaration,
+        ClassDeclaration: visit_class_declaration,
+        StructDeclaration: visit_struct_declaration,
+        LabelDeclaration: visit_label_declaration,
+        GotoStatement: visit_goto_statement,
+        IfStatement: visit_if_statement,
+        WhileStatement: visit_while_statement,
+        ForLoop: visit_for_loop,
+        SwitchStatement: visit_switch_statement,
+        ConstDeclaration: visit_const_declaration,
+        ReturnStatement: visit_return_statement,
+        ExpressionStatement: visit_expression_statement,
+        **_COMMAND_VISITORS,
+        RawBlock: visit_raw_block,
+        Comment: visit_comment,
+        # Absent optional children are visited as no-ops
+        type(None): visit_empty,
+        # Steps queued by visitors that must run after earlier output
+        partial: _run_deferred,
+    }
+    
+    # Expression formatters keyed the same way
+    _EXPR_DISPATCH = {
+        ArrayAccess: _expr_array_access,
+        TernaryExpression: _expr_ternary,
+        MemberAccess: _expr_member_access,
+        FunctionCall: _expr_function_call,
+        BinaryOp: _expr_binary_op,
+        UnaryOp: _expr_unary_op,
+        Assignment: _expr_assignment,
+        type(None): _expr_empty,
+    }
+    
+    # Expressions whose rendering depends only on the subtree
+    _CACHED_EXPRS = frozenset({BinaryOp, UnaryOp, MemberAccess, ArrayAccess})
@@ -5,13 +5,24 @@ Tokenizes ClearScript source code into a stream of tokens.
 """
 
 import re
-from enum import Enum, auto
-from dataclasses import dataclass
-from typing import List, Optional
+import sys
+from enum import IntEnum, auto
+from functools import lru_cache
+from typing import Iterator, List, Tuple
 
 
-class TokenType(Enum):
-    """Token types for ClearScript."""
+class TokenType(IntEnum):
+    """
+    Token types for ClearScript.
+    
+    An IntEnum so token-type comparisons and the dict/set lookups done
+    while parsing use int equality and hashing instead of Enum's
+    Python-level __hash__.
+    
+    auto() numbers members in declaration order, so each category below
+    is a contiguous range; keep new members inside their group (see
+    FIRST_KEYWORD and friends).
+    """
     # Keywords
     INT = auto()
     FLOAT = auto()
@@ -105,13 +116,98 @@ class TokenType(Enum):
     EOF = auto()
 
 
-@dataclass
+# Category bounds, so "is this a keyword/operator" is a range check
+FIRST_KEYWORD = TokenType.INT
+LAST_KEYWORD = TokenType.RAW
+FIRST_OPERATOR = TokenType.PLUS
+LAST_OPERATOR = TokenType.DECREMENT
+FIRST_DELIMITER = TokenType.LPAREN
+LAST_DELIMITER = TokenType.QUESTION
+
+
+# Operators and delimiters
+SYMBOLS = {
+    '==': TokenType.EQ,
+    '!=': TokenType.NEQ,
+    '<=': TokenType.LTE,
+    '>=': TokenType.GTE,
+    '&&': TokenType.AND,
+    '||': TokenType.OR,
+    '++': TokenType.INCREMENT,
+    '--': TokenType.DECREMENT,
+    '+': TokenType.PLUS,
+    '-': TokenType.MINUS,
+    '*': TokenType.MULTIPLY,
+    '/': TokenType.DIVIDE,
+    '=': TokenType.ASSIGN,
+    '<': TokenType.LT,
+    '>': TokenType.GT,
+    '!': TokenType.NOT,
+    '(': TokenType.LPAREN,
+    ')': TokenType.RPAREN,
+    '{': TokenType.LBRACE,
+    '}': TokenType.RBRACE,
+    '[': TokenType.LBRACKET,
+    ']': TokenType.RBRACKET,
+    ';': TokenType.SEMICOLON,
+    ',': TokenType.COMMA,
+    ':': TokenType.COLON,
+    '.': TokenType.DOT,
+    '?': TokenType.QUESTION,
+}
+
+# Symbol text -> (token type, interned value), so every token shares one string
+_SYMBOL_TOKENS = {text: (token_type, sys.intern(text)) for text, token_type in SYMBOLS.items()}
+
+# One alternation over every token kind. Symbols are listed longest first so
+# '<=' wins over '<'; the BAD_* and ERROR groups turn the remaining cases
+# into positioned SyntaxErrors instead of silently skipped text. Comment
+# bodies are matched as runs of a negated class ("unrolled" form), which sre
+# scans in one tight C loop instead of retrying '*/' after every character.
+_TOKEN_RE = re.compile(r"""
+    (?P<WS>[ \t\r\n]+)
+  | (?P<LINE_COMMENT>//[^\n]*)
+  | (?P<BLOCK_COMMENT>/\*[^*]*\*+(?:[^/*][^*]*\*+)*/)
+  | (?P<BAD_BLOCK_COMMENT>/\*)
+  | (?P<NUMBER>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?)
+  | (?P<IDENTIFIER>[^\W\d]\w*)
+  | (?P<STRING>"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')
+  | (?P<BAD_STRING>["'])
+  | (?P<SYMBOL>""" + "|".join(re.escape(text) for text in sorted(SYMBOLS, key=len, reverse=True)) + r""")
+  | (?P<ERROR>.)
+""", re.VERBOSE | re.DOTALL)
+
+# Backslash escapes inside string literals; any other escaped character
+# stands for itself (so \\ and \" need no entry)
+_ESCAPE_RE = re.compile(r"\\(.)", re.DOTALL)
+_ESCAPES = {'n': '\n', 't': '\t'}
+
+
+def _unescape(match) -> str:
+    """Replace one backslash escape with the character it stands for."""
+    char = match.group(1)
+    return _ESCAPES.get(char, char)
+
+
 class Token:
     """Represents a single token."""
-    type: TokenType
-    value: any
-    line: int
-    column: int
+    
+    # Written out rather than a dataclass so instances carry no __dict__
+    # on every supported Python version
+    __slots__ = ('type', 'value', 'line', 'column')
+    
+    def __init__(self, type: TokenType, value: any, line: int, column: int):
+        self.type = type
+        self.value = value
+        self.line = line
+        self.column = column
+    
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.type, self.value, self.line, self.column) == (other.type, other.value, other.line, other.column)
+    
+    __hash__ = None
     
     def __repr__(self):
         return f"Token({self.type.name}, {repr(self.value)}, {self.line}:{self.column})"
@@ -160,6 +256,9 @@ class Lexer:
         'auto': TokenType.AUTO,
     }
     
+    # Longer identifiers cannot be keywords and skip the table probe
+    _KEYWORD_MAX_LEN = max(map(len, KEYWORDS))
+    
     def __init__(self, source: str):
         """Initialize the lexer with source code."""
         self.source = source
@@ -168,259 +267,111 @@ class Lexer:
         self.column = 1
         self.tokens: List[Token] = []
     
-    def current_char(self) -> Optional[str]:
-        """Get the current character without advancing."""
-        if self.pos >= len(self.source):
-            return None
-        return self.source[self.pos]
-    
-    def peek_char(self, offset: int = 1) -> Optional[str]:
-        """Peek ahead at a character."""
-        pos = self.pos + offset
-        if pos >= len(self.source):
-            return None
-        return self.source[pos]
+    def tokenize(self) -> List[Token]:
+        """Tokenize the entire source code."""
+        self.tokens = list(self.iter_tokens())
+        return self.tokens
     
-    def advance(self) -> Optional[str]:
-        """Consume and return the current character."""
-        if self.pos >= len(self.source):
-            return None
-        
-        char = self.source[self.pos]
-        self.pos += 1
-        
-        if char == '\n':
-            self.line += 1
-            self.column = 1
-        else:
-            self.column += 1
-        
-        return char
+    @staticmethod
+    def is_keyword(token_type: TokenType) -> bool:
+        """Return True if token_type is one of the reserved-word types."""
+        return FIRST_KEYWORD <= token_type <= LAST_KEYWORD
     
-    def skip_whitespace(self):
-        """Skip whitespace characters (except newlines in some contexts)."""
-        while self.current_char() and self.current_char() in ' \t\r\n':
-            self.advance()
+    @staticmethod
+    def is_operator(token_type: TokenType) -> bool:
+        """Return True if token_type is an arithmetic, comparison or logical operator."""
+        return FIRST_OPERATOR <= token_type <= LAST_OPERATOR
     
-    def read_line_comment(self) -> str:
-        """Read a line comment starting with //"""
-        comment = ""
-        self.advance()  # Skip first /
-        self.advance()  # Skip second /
+    @staticmethod
+    def tokenize_cached(source: str) -> List[Token]:
+        """
+        Tokenize source, reusing the result for recently seen inputs.
         
-        while self.current_char() and self.current_char() != '\n':
-            comment += self.current_char()
-            self.advance()
+        Useful for tools that lex the same files repeatedly. Tokens are
+        shared between calls and must not be modified; the returned list
+        itself is a fresh copy.
         
-        return comment.strip()
-    
-    def read_block_comment(self) -> str:
-        """Read a block comment /* ... */"""
-        comment = ""
-        self.advance()  # Skip /
-        self.advance()  # Skip *
-        
-        while True:
-            if self.current_char() is None:
-                raise SyntaxError(f"Unterminated block comment at {self.line}:{self.column}")
-            
-            if self.current_char() == '*' and self.peek_char() == '/':
-                self.advance()  # Skip *
-                self.advance()  # Skip /
-                break
+        Args:
+            source: ClearScript source code
             
-            comment += self.current_char()
-            self.advance()
-        
-        return comment.strip()
-    
-    def read_number(self) -> Token:
-        """Read a numeric literal."""
-        start_line = self.line
-        start_column = self.column
-        num_str = ""
-        
-        while self.current_char() and (self.current_char().isdigit() or self.current_char() == '.'):
-            num_str += self.current_char()
-            self.advance()
-        
-        # Determine if int or float
-        if '.' in num_str:
-            value = float(num_str)
-        else:
-            value = int(num_str)
-        
-        return Token(TokenType.NUMBER, value, start_line, start_column)
+        Returns:
+            List of tokens ending with EOF
+        """
+        return list(_tokenize_cached(source))
     
-    def read_identifier(self) -> Token:
-        """Read an identifier or keyword."""
-        start_line = self.line
-        start_column = self.column
-        ident = ""
+    def iter_tokens(self) -> Iterator[Token]:
+        """
+        Yield tokens one at a time, ending with EOF.
         
-        while self.current_char() and (self.current_char().isalnum() or self.current_char() == '_'):
-            ident += self.current_char()
-            self.advance()
+        The scan is driven by one compiled master pattern, so each token
+        costs a single regex step instead of a Python loop per character.
+        Line and column numbers are tracked from the newlines inside the
+        matched text. Consumers that only look at each token once can use
+        this instead of tokenize() to avoid holding the whole list.
+        """
+        source = self.source
+        keywords = self.KEYWORDS
+        max_keyword_len = self._KEYWORD_MAX_LEN
+        line = 1
+        line_start = 0  # Offset of the first character on the current line
         
-        # Check if it's a keyword
-        token_type = self.KEYWORDS.get(ident, TokenType.IDENTIFIER)
-        
-        return Token(token_type, ident, start_line, start_column)
-    
-    def read_string(self) -> Token:
-        """Read a string literal."""
-        start_line = self.line
-        start_column = self.column
-        quote_char = self.current_char()  # ' or "
-        self.advance()  # Skip opening quote
-        
-        string = ""
-        while self.current_char() and self.current_char() != quote_char:
-            if self.current_char() == '\\':
-                self.advance()
-                # Handle escape sequences
-                escape_char = self.current_char()
-                if escape_char == 'n':
-                    string += '\n'
-                elif escape_char == 't':
-                    string += '\t'
-                elif escape_char == '\\':
-                    string += '\\'
-                elif escape_char == quote_char:
-                    string += quote_char
+        for match in _TOKEN_RE.finditer(source):
+            kind = match.lastgroup
+            text = match.group()
+            start = match.start()
+            column = start - line_start + 1
+            
+            if kind == 'WS':
+                pass
+            elif kind == 'IDENTIFIER':
+                # Names, types and keywords repeat constantly; share one object each
+                ident = sys.intern(text)
+                if len(ident) > max_keyword_len:
+                    token_type = TokenType.IDENTIFIER
                 else:
-                    string += escape_char
-                self.advance()
+                    token_type = keywords.get(ident, TokenType.IDENTIFIER)
+                yield Token(token_type, ident, line, column)
+            elif kind == 'SYMBOL':
+                token_type, value = _SYMBOL_TOKENS[text]
+                yield Token(token_type, value, line, column)
+            elif kind == 'NUMBER':
+                value = int(text) if text.isdigit() else float(text)
+                yield Token(TokenType.NUMBER, value, line, column)
+            elif kind == 'STRING':
+                value = text[1:-1]
+                if '\\' in value:
+                    value = _ESCAPE_RE.sub(_unescape, value)
+                yield Token(TokenType.STRING, value, line, column)
+            elif kind == 'LINE_COMMENT':
+                yield Token(TokenType.COMMENT, text[2:].strip(), line, column)
+            elif kind == 'BLOCK_COMMENT':
+                yield Token(TokenType.COMMENT, text[2:-2].strip(), line, column)
+            elif kind == 'BAD_STRING':
+                raise SyntaxError(f"Unterminated string at {line}:{column}")
+            elif kind == 'BAD_BLOCK_COMMENT':
+                # Reported where the input runs out, like any unexpected EOF
+                line += source.count('\n', start)
+                line_start = source.rfind('\n') + 1
+                end_column = len(source) - line_start + 1
+                raise SyntaxError(f"Unterminated block comment at {line}:{end_column}")
             else:
-                string += self.current_char()
-                self.advance()
-        
-        if self.current_char() != quote_char:
-            raise SyntaxError(f"Unterminated string at {start_line}:{start_column}")
-        
-        self.advance()  # Skip closing quote
-        return Token(TokenType.STRING, string, start_line, start_column)
-    
-    def tokenize(self) -> List[Token]:
-        """Tokenize the entire source code."""
-        self.tokens = []
-        
-        while self.pos < len(self.source):
-            self.skip_whitespace()
-            
-            if self.current_char() is None:
-                break
-            
-            start_line = self.line
-            start_column = self.column
-            char = self.current_char()
-            
-            # Comments
-            if char == '/' and self.peek_char() == '/':
-                comment = self.read_line_comment()
-                self.tokens.append(Token(TokenType.COMMENT, comment, start_line, start_column))
-                continue
-            
-            if char == '/' and self.peek_char() == '*':
-                comment = self.read_block_comment()
-                self.tokens.append(Token(TokenType.COMMENT, comment, start_line, start_column))
-                continue
-            
-            # Numbers
-            if char.isdigit():
-                self.tokens.append(self.read_number())
-                continue
-            
-            # Identifiers and keywords
-            if char.isalpha() or char == '_':
-                self.tokens.append(self.read_identifier())
-                continue
+                raise SyntaxError(f"Unexpected character '{text}' at {line}:{column}")
             
-            # Strings
-            if char in '"\'':
-                self.tokens.append(self.read_string())
-                continue
-            
-            # Two-character operators
-            if char == '=' and self.peek_char() == '=':
-                self.advance()
-                self.advance()
-                self.tokens.append(Token(TokenType.EQ, '==', start_line, start_column))
-                continue
-            
-            if char == '!' and self.peek_char() == '=':
-                self.advance()
-                self.advance()
-                self.tokens.append(Token(TokenType.NEQ, '!=', start_line, start_column))
-                continue
-            
-            if char == '<' and self.peek_char() == '=':
-                self.advance()
-                self.advance()
-                self.tokens.append(Token(TokenType.LTE, '<=', start_line, start_column))
-                continue
-            
-            if char == '>' and self.peek_char() == '=':
-                self.advance()
-                self.advance()
-                self.tokens.append(Token(TokenType.GTE, '>=', start_line, start_column))
-                continue
-            
-            if char == '&' and self.peek_char() == '&':
-                self.advance()
-                self.advance()
-                self.tokens.append(Token(TokenType.AND, '&&', start_line, start_column))
-                continue
-            
-            if char == '|' and self.peek_char() == '|':
-                self.advance()
-                self.advance()
-                self.tokens.append(Token(TokenType.OR, '||', start_line, start_column))
-                continue
-            
-            if char == '+' and self.peek_char() == '+':
-                self.advance()
-                self.advance()
-                self.tokens.append(Token(TokenType.INCREMENT, '++', start_line, start_column))
-                continue
-            
-            if char == '-' and self.peek_char() == '-':
-                self.advance()
-                self.advance()
-                self.tokens.append(Token(TokenType.DECREMENT, '--', start_line, start_column))
-                continue
-            
-            # Single-character tokens
-            single_char_tokens = {
-                '+': TokenType.PLUS,
-                '-': TokenType.MINUS,
-                '*': TokenType.MULTIPLY,
-                '/': TokenType.DIVIDE,
-                '=': TokenType.ASSIGN,
-                '<': TokenType.LT,
-                '>': TokenType.GT,
-                '!': TokenType.NOT,
-                '(': TokenType.LPAREN,
-                ')': TokenType.RPAREN,
-                '{': TokenType.LBRACE,
-                '}': TokenType.RBRACE,
-                '[': TokenType.LBRACKET,
-                ']': TokenType.RBRACKET,
-                ';': TokenType.SEMICOLON,
-                ',': TokenType.COMMA,
-                ':': TokenType.COLON,
-                '.': TokenType.DOT,
-                '?': TokenType.QUESTION,
-            }
-            
-            if char in single_char_tokens:
-                self.advance()
-                self.tokens.append(Token(single_char_tokens[char], char, start_line, start_column))
-                continue
-            
-            # Unknown character
-            raise SyntaxError(f"Unexpected character '{char}' at {start_line}:{start_column}")
+            # Whitespace, block comments and strings may span lines
+            newlines = text.count('\n')
+            if newlines:
+                line += newlines
+                line_start = start + text.rindex('\n') + 1
+        
+        self.pos = len(source)
+        self.line = line
+        self.column = self.pos - line_start + 1
         
         # Add EOF token
-        self.tokens.append(Token(TokenType.EOF, None, self.line, self.column))
-        return self.tokens
+        yield Token(TokenType.EOF, None, self.line, self.column)
+
+
+@lru_cache(maxsize=64)
+def _tokenize_cached(source: str) -> Tuple[Token, ...]:
+    """Tokenize source once per distinct string (see Lexer.tokenize_cached)."""
+    return tuple(Lexer(source).iter_tokens())
@@ -5,7 +5,10 @@ Converts a stream of tokens into an Abstract Syntax Tree (AST).
 Targets InfiltrationEngine's StateScript.
 """
 
-from typing import List, Optional
+import io
+import math
+import operator
+from typing import Dict, List, Optional
 from .lexer import Token, TokenType
 from .ast_nodes import *
 
@@ -15,32 +18,166 @@ class ParseError(Exception):
     pass
 
 
+# Rule ids for the optional memo table, keyed by (rule, token index)
+_RULE_EXPRESSION = 0
+
+
+def _mask(*token_types: TokenType) -> int:
+    """Build a bit set with one bit per token type, for Parser.match_mask."""
+    mask = 0
+    for token_type in token_types:
+        mask |= 1 << token_type
+    return mask
+
+
+# Binary operator precedence, loosest first (see Parser.parse_binary)
+_BINARY_PRECEDENCE = {
+    TokenType.OR: 1,
+    TokenType.AND: 2,
+    TokenType.EQ: 3,
+    TokenType.NEQ: 3,
+    TokenType.LT: 4,
+    TokenType.GT: 4,
+    TokenType.LTE: 4,
+    TokenType.GTE: 4,
+    TokenType.PLUS: 5,
+    TokenType.MINUS: 5,
+    TokenType.MULTIPLY: 6,
+    TokenType.DIVIDE: 6,
+}
+
+# Operators Parser(fold_constants=True) evaluates between numeric literals.
+# Division is left to the runtime, which owns its integer semantics.
+_FOLDABLE_OPS = {
+    TokenType.PLUS: operator.add,
+    TokenType.MINUS: operator.sub,
+    TokenType.MULTIPLY: operator.mul,
+}
+_NUMERIC_LITERALS = ('int', 'float')
+
+
+def _numeric_value(node: ASTNode):
+    """
+    Return the number a foldable operand stands for, or None.
+    
+    Accepts a numeric Literal and a unary minus over one, which is how
+    both a written '-3' and a negative fold result are represented.
+    """
+    negate = type(node) is UnaryOp and node.operator == '-' and not node.is_postfix
+    if negate:
+        node = node.operand
+    if type(node) is not Literal or node.literal_type not in _NUMERIC_LITERALS:
+        return None
+    return -node.value if negate else node.value
+
+# Operand kinds for _SIMPLE_COMMANDS
+_NAME = 0  # a bare identifier, stored as its name
+_EXPR = 1  # any expression
+
+# Commands of the form keyword(operand, ...); -> (node class, ((field, kind), ...))
+_SIMPLE_COMMANDS = {
+    TokenType.KILL: (KillStatement, ()),
+    TokenType.WAIT: (WaitStatement, (('time', _EXPR),)),
+    TokenType.WAITFOR: (WaitForStatement, (('condition', _EXPR),)),
+    TokenType.SET: (SetStatement, (('variable', _NAME), ('value', _EXPR))),
+    TokenType.PUSH: (PushStatement, (('value', _EXPR),)),
+    TokenType.POP: (PopStatement, (('variable', _NAME),)),
+    TokenType.PEEK: (PeekStatement, (('variable', _NAME),)),
+}
+
+# Builtin calls -> (node class, positional fields, field for any extra arguments)
+_BUILTIN_CALLS = {
+    TokenType.SPAWNBOT: (SpawnBotCall, ('template', 'location'), 'attributes'),
+    TokenType.MOVETO: (MoveToCall, ('prop', 'location'), None),
+    TokenType.ANIMATE: (AnimateCall, ('prop', 'location', 'time'), None),
+    TokenType.DELETE: (DeleteCall, ('prop',), None),
+}
+
+# Token groups tested on hot paths
+_MASK_TYPE_DECL = _mask(TokenType.INT, TokenType.FLOAT)
+_MASK_BLOCK_END = _mask(TokenType.RBRACE, TokenType.EOF)
+_MASK_CASE_END = _mask(TokenType.CASE, TokenType.DEFAULT, TokenType.RBRACE)
+_MASK_PREFIX_OP = _mask(TokenType.NOT, TokenType.MINUS, TokenType.INCREMENT, TokenType.DECREMENT)
+
+
+# TokenType members bound once at module level: method bodies then do a
+# global lookup instead of a global plus an enum class attribute lookup
+_TT_ASSIGN = TokenType.ASSIGN
+_TT_BREAK = TokenType.BREAK
+_TT_CASE = TokenType.CASE
+_TT_COLON = TokenType.COLON
+_TT_COMMA = TokenType.COMMA
+_TT_COMMENT = TokenType.COMMENT
+_TT_DEFAULT = TokenType.DEFAULT
+_TT_ELSE = TokenType.ELSE
+_TT_EOF = TokenType.EOF
+_TT_IDENTIFIER = TokenType.IDENTIFIER
+_TT_IF = TokenType.IF
+_TT_LBRACE = TokenType.LBRACE
+_TT_LBRACKET = TokenType.LBRACKET
+_TT_LPAREN = TokenType.LPAREN
+_TT_METHOD = TokenType.METHOD
+_TT_NUMBER = TokenType.NUMBER
+_TT_QUESTION = TokenType.QUESTION
+_TT_RBRACE = TokenType.RBRACE
+_TT_RBRACKET = TokenType.RBRACKET
+_TT_RPAREN = TokenType.RPAREN
+_TT_SEMICOLON = TokenType.SEMICOLON
+_TT_STRING = TokenType.STRING
+
+
 class Parser:
     """Recursive descent parser for ClearScript."""
     
-    def __init__(self, tokens: List[Token]):
-        """Initialize the parser with a list of tokens."""
+    def __init__(self, tokens: List[Token], memoize: bool = False, keep_comments: bool = False,
+                 fold_constants: bool = False):
+        """
+        Initialize the parser with a list of tokens.
+        
+        Args:
+            tokens: Token stream produced by the lexer
+            memoize: Cache expression results by token position. Only pays
+                off on inputs that re-parse the same span; off by default.
+            keep_comments: Emit statement-level comments as Comment nodes
+                instead of dropping them.
+            fold_constants: Replace +, - and * between two numeric literals
+                with a single literal holding the result.
+        """
+        if not keep_comments:
+            # Dropped comments carry no meaning, so filter them once here
+            # rather than skipping them before every statement
+            tokens = [token for token in tokens if token.type != _TT_COMMENT]
         self.tokens = tokens
         self.pos = 0
+        self._memo = {} if memoize else None
+        self.keep_comments = keep_comments
+        self.fold_constants = fold_constants
+        # The token list never changes, so the EOF bound is computed once
+        self._last = len(tokens) - 1
+        self._eof = tokens[-1]
+        # Token types as a parallel list: match() only needs the type, so it
+        # skips fetching the Token and its attribute
+        self._types = [token.type for token in tokens]
     
     def current_token(self) -> Token:
         """Get the current token."""
-        if self.pos >= len(self.tokens):
-            return self.tokens[-1]  # Return EOF
-        return self.tokens[self.pos]
+        pos = self.pos
+        if pos > self._last:
+            return self._eof
+        return self.tokens[pos]
     
     def peek_token(self, offset: int = 1) -> Token:
         """Peek ahead at a token."""
         pos = self.pos + offset
-        if pos >= len(self.tokens):
-            return self.tokens[-1]  # Return EOF
+        if pos > self._last:
+            return self._eof
         return self.tokens[pos]
     
     def advance(self) -> Token:
-        """Consume and return the current token."""
-        token = self.current_token()
-        if self.pos < len(self.tokens) - 1:
-            self.pos += 1
+        """Consume and return the current token (EOF is never consumed)."""
+        pos = self.pos
+        token = self.tokens[pos]
+        self.pos = pos + (pos < self._last)
         return token
     
     def expect(self, token_type: TokenType) -> Token:
@@ -53,184 +190,155 @@ class Parser:
            )
         return self.advance()
     
+    def current_type(self) -> TokenType:
+        """Get the type of the current token."""
+        # advance() never moves past EOF, so pos is always in range
+        return self._types[self.pos]
+    
     def match(self, *token_types: TokenType) -> bool:
         """Check if current token matches any of the given types."""
-        return self.current_token().type in token_types
+        return self._types[self.pos] in token_types
     
-    def skip_comments(self):
-        """Skip comment tokens."""
-        while self.match(TokenType.COMMENT):
-            self.advance()
+    def match_mask(self, mask: int) -> bool:
+        """Check if current token is in a bit set built with _mask()."""
+        return mask >> self._types[self.pos] & 1 == 1
+    
+    def _make(self, node_class, token, **fields) -> ASTNode:
+        """Build a node positioned at token (anything with line and column)."""
+        return node_class(line=token.line, column=token.column, **fields)
     
     def parse(self) -> Program:
         """Parse the entire program."""
         statements = []
         
-        while not self.match(TokenType.EOF):
-            self.skip_comments()
-            if self.match(TokenType.EOF):
-                break
-            
+        while not self.match(_TT_EOF):
             stmt = self.parse_statement()
             if stmt:
                 statements.append(stmt)
         
         return Program(statements=statements)
     
-    def parse_statement(self) -> Optional[ASTNode]:
-        """Parse a single statement."""
-        self.skip_comments()
-        
-        # Const declaration (treated as variable)
-        if self.match(TokenType.CONST):
-            const_token = self.advance()
-            if not self.match(TokenType.INT, TokenType.FLOAT):
-                raise ParseError("Expected type after const")
-            type_token = self.advance()
-            name_token = self.expect(TokenType.IDENTIFIER)
-            self.expect(TokenType.ASSIGN)
-            value = self.parse_expression()
-            self.expect(TokenType.SEMICOLON)
-            return ConstDeclaration(
-                var_type=type_token.value,
-                name=name_token.value,
-                value=value,
-                line=const_token.line,
-                column=const_token.column
-            )
-        
-        # Variable declaration (including arrays)
-        if self.match(TokenType.INT, TokenType.FLOAT):
-            return self.parse_variable_declaration()
-        
-        # Function declaration
-        if self.match(TokenType.FUNCTION):
-            return self.parse_function_declaration()
-        
-        # Class declaration
-        if self.match(TokenType.CLASS):
-            return self.parse_class_declaration()
-        
-        # Struct declaration
-        if self.match(TokenType.STRUCT):
-            return self.parse_struct_declaration()
-        
-        # Label declaration
-        if self.match(TokenType.LABEL):
-            return self.parse_label_declaration()
-        
-        # Goto statement
-        if self.match(TokenType.GOTO):
-            return self.parse_goto_statement()
-        
-        # If statement
-        if self.match(TokenType.IF):
-            return self.parse_if_statement()
-        
-        # While statement
-        if self.match(TokenType.WHILE):
-            return self.parse_while_statement()
-        
-        # For loop
-        if self.match(TokenType.FOR):
-            return self.parse_for_loop()
-        
-        # Switch statement
-        if self.match(TokenType.SWITCH):
-            return self.parse_switch_statement()
-        
-        # Return statement
-        if self.match(TokenType.RETURN):
-            return self.parse_return_statement()
-        
-        # Simple statement keywords
-        if self.match(TokenType.KILL):
-            return self.parse_kill_statement()
-        
-        if self.match(TokenType.WAIT):
-            return self.parse_wait_statement()
-        
-        if self.match(TokenType.WAITFOR):
-            return self.parse_waitfor_statement()
-        
-        if self.match(TokenType.THREAD):
-            return self.parse_thread_statement()
-        
-        # Check if these are function calls (followed by '(') or statements
-        if self.match(TokenType.SET):
-            if self.peek_token().type == TokenType.LPAREN:
-                return self.parse_set_statement()
-            # Otherwise it's used as identifier in expression
-            return self.parse_expression_statement()
+    def parse_incremental(self, cache: Dict[tuple, list]) -> Program:
+        """
+        Parse the entire program, reusing unchanged top-level statements.
+        
+        cache holds the top-level statements of the previous parse, each
+        under the exact tokens (type, value and position) it was parsed
+        from. A statement whose tokens match is taken as-is instead of
+        being parsed again, so an edit only re-parses the declarations it
+        touches, plus any after it that moved to other lines. The cache is
+        replaced with this parse's statements; pass the same dict on every
+        reparse of a file, from parsers built with the same options.
+        
+        Args:
+            cache: Mapping from a statement's first token to its
+                (token signature, node) entries; start with an empty dict
+            
+        Returns:
+            The parsed Program
+        """
+        signature = [(token.type, token.value, token.line, token.column) for token in self.tokens]
+        new_cache = {}
+        statements = []
         
-        if self.match(TokenType.PUSH):
-            if self.peek_token().type == TokenType.LPAREN:
-                return self.parse_push_statement()
-            return self.parse_expression_statement()
+        while not self.match(_TT_EOF):
+            start = self.pos
+            stmt = None
+            for key, node in cache.get(signature[start], ()):
+                end = start + len(key)
+                if tuple(signature[start:end]) == key:
+                    stmt = node
+                    self.pos = end
+                    break
+            else:
+                stmt = self.parse_statement()
+                key = tuple(signature[start:self.pos])
+            
+            new_cache.setdefault(signature[start], []).append((key, stmt))
+            statements.append(stmt)
         
-        if self.match(TokenType.POP):
-            if self.peek_token().type == TokenType.LPAREN:
-                return self.parse_pop_statement()
+        cache.clear()
+        cache.update(new_cache)
+        return Program(statements=statements)
+    
+    def parse_statement(self) -> Optional[ASTNode]:
+        """Parse a single statement."""
+        # One lookup on the leading token instead of a chain of match() calls
+        parser = self._STATEMENT_DISPATCH.get(self.current_type())
+        if parser is None:
+            # Assignment or expression statement
             return self.parse_expression_statement()
-        
-        if self.match(TokenType.PEEK):
-            if self.peek_token().type == TokenType.LPAREN:
-                return self.parse_peek_statement()
+        return parser(self)
+    
+    def parse_const_declaration(self) -> ConstDeclaration:
+        """Parse: const int NAME = value;"""
+        const_token = self.advance()
+        if not self.match_mask(_MASK_TYPE_DECL):
+            raise ParseError("Expected type after const")
+        type_token = self.advance()
+        name_token = self.expect(_TT_IDENTIFIER)
+        self.expect(_TT_ASSIGN)
+        value = self.parse_expression()
+        self.expect(_TT_SEMICOLON)
+        return self._make(
+            ConstDeclaration, const_token,
+            var_type=type_token.value,
+            name=name_token.value,
+            value=value
+        )
+    
+    def parse_command_or_expression(self) -> ASTNode:
+        """Parse set/push/pop/peek: a command when followed by '(', otherwise an expression."""
+        if self.peek_token().type != _TT_LPAREN:
             return self.parse_expression_statement()
-        
-        # Built-in function calls
-        if self.match(TokenType.SPAWNBOT, TokenType.MOVETO, TokenType.ANIMATE, TokenType.DELETE):
-            return self.parse_builtin_call()
-        
-        # Raw StateScript block
-        if self.match(TokenType.RAW):
-            return self.parse_raw_block()
-        
-        # Assignment or expression statement
-        return self.parse_expression_statement()
+        return self.parse_simple_command()
+    
+    def parse_comment(self) -> Comment:
+        """Parse a comment token into a Comment node."""
+        comment_token = self.advance()
+        text = comment_token.value
+        
+        return Comment(
+            text=text,
+            is_block='\n' in text,  # Multi-line text can only be kept as /* */
+            line=comment_token.line,
+            column=comment_token.column
+        )
     
     def parse_raw_block(self) -> RawBlock:
         """Parse: raw { ... } - allows direct StateScript injection."""
         raw_token = self.advance()  # Skip 'raw'
-        self.expect(TokenType.LBRACE)
+        self.expect(_TT_LBRACE)
         
-        # Collect everything until the closing brace
-        raw_code = []
+        # Collect everything until the closing brace, one space after each piece
+        buf = io.StringIO()
+        write = buf.write
         brace_count = 1
         
-        while brace_count > 0 and not self.match(TokenType.EOF):
+        while brace_count > 0 and not self.match(_TT_EOF):
             token = self.current_token()
+            token_type = token.type
             
-            if token.type == TokenType.LBRACE:
+            if token_type == _TT_LBRACE:
                 brace_count += 1
-                raw_code.append('{')
-            elif token.type == TokenType.RBRACE:
+                write('{ ')
+            elif token_type == _TT_RBRACE:
                 brace_count -= 1
                 if brace_count > 0:
-                    raw_code.append('}')
-            else:
-                # Add token value as-is
-                if token.type == TokenType.IDENTIFIER or token.type in [
-                    TokenType.INT, TokenType.FLOAT, TokenType.FUNCTION, TokenType.GOTO,
-                    TokenType.LABEL, TokenType.WAIT, TokenType.KILL, TokenType.SET,
-                    TokenType.PUSH, TokenType.POP, TokenType.PEEK, TokenType.SPAWNBOT,
-                    TokenType.MOVETO, TokenType.ANIMATE, TokenType.DELETE
-                ]:
-                    raw_code.append(str(token.value))
-                elif token.type == TokenType.NUMBER:
-                    raw_code.append(str(token.value))
-                elif token.type == TokenType.STRING:
-                    raw_code.append(f'[{token.value}]')
-                elif token.value:
-                    raw_code.append(str(token.value))
+                    write('} ')
+            elif token_type == _TT_STRING:
+                write(f'[{token.value}] ')
+            elif token_type == _TT_COMMENT:
+                # ClearScript comments are never part of the injected
+                # StateScript, whether or not keep_comments is set
+                pass
+            elif token_type == _TT_NUMBER or token.value:
+                # Keywords and identifiers pass through as their own text
+                write(f'{token.value} ')
             
             self.advance()
         
-        return RawBlock(
-            code=' '.join(raw_code).strip(),
-            line=raw_token.line,
-            column=raw_token.column
-        )
+        return self._make(RawBlock, raw_token, code=buf.getvalue().rstrip())
     
     def parse_variable_declaration(self) -> VariableDeclaration:
         """Parse: int x = 5; or int[] arr = [1, 2, 3];"""
@@ -239,699 +347,516 @@ class Parser:
         
         # Check for array type: int[]
         is_array = False
-        if self.match(TokenType.LBRACKET):
+        if self.match(_TT_LBRACKET):
             self.advance()  # Skip [
-            self.expect(TokenType.RBRACKET)  # Expect ]
+            self.expect(_TT_RBRACKET)  # Expect ]
             is_array = True
         
-        name_token = self.expect(TokenType.IDENTIFIER)
+        name_token = self.expect(_TT_IDENTIFIER)
         name = name_token.value
         
         value = None
-        if self.match(TokenType.ASSIGN):
+        if self.match(_TT_ASSIGN):
             self.advance()
             value = self.parse_expression()
         
-        self.expect(TokenType.SEMICOLON)
+        self.expect(_TT_SEMICOLON)
         
         if is_array:
-            return ArrayDeclaration(
+            return self._make(
+                ArrayDeclaration, type_token,
                 elem_type=var_type,
                 name=name,
-                initializer=value,
-                line=type_token.line,
-                column=type_token.column
+                initializer=value
             )
         else:
-            return VariableDeclaration(
+            return self._make(
+                VariableDeclaration, type_token,
                 var_type=var_type,
                 name=name,
-                value=value,
-                line=type_token.line,
-                column=type_token.column
+                value=value
             )
     
     def parse_function_declaration(self) -> FunctionDeclaration:
         """Parse: function name(param1, param2) { ... }"""
         func_token = self.advance()  # Skip 'function'
         
-        name_token = self.expect(TokenType.IDENTIFIER)
+        name_token = self.expect(_TT_IDENTIFIER)
         name = name_token.value
         
-        self.expect(TokenType.LPAREN)
+        self.expect(_TT_LPAREN)
         params = []
         
-        while not self.match(TokenType.RPAREN):
-            param_token = self.expect(TokenType.IDENTIFIER)
+        while not self.match(_TT_RPAREN):
+            param_token = self.expect(_TT_IDENTIFIER)
             params.append(param_token.value)
             
-            if self.match(TokenType.COMMA):
+            if self.match(_TT_COMMA):
                 self.advance()
         
-        self.expect(TokenType.RPAREN)
-        self.expect(TokenType.LBRACE)
-        body = self.parse_block()
-        self.expect(TokenType.RBRACE)
+        self.expect(_TT_RPAREN)
+        body = self._parse_brace_block()
         
-        return FunctionDeclaration(
+        return self._make(
+            FunctionDeclaration, func_token,
             name=name,
             params=params,
-            body=body,
-            line=func_token.line,
-            column=func_token.column
+            body=body
         )
     
     def parse_class_declaration(self) -> ClassDeclaration:
         """Parse: class Name { properties... methods... }"""
-        class_token = self.advance()  # Skip 'class'
-        name_token = self.expect(TokenType.IDENTIFIER)
-        name = name_token.value
-        
-        self.expect(TokenType.LBRACE)
-        
-        properties = []
-        methods = []
-        
-        while not self.match(TokenType.RBRACE):
-            # Check for method
-            if self.match(TokenType.METHOD):
-                methods.append(self.parse_method_declaration())
-            # Check for property (variable declaration)
-            elif self.match(TokenType.INT, TokenType.FLOAT):
-                prop = self.parse_variable_declaration()
-                properties.append(prop)
-            else:
-                raise ParseError(f"Unexpected token in class body: {self.current_token().type}")
-        
-        self.expect(TokenType.RBRACE)
-        
-        return ClassDeclaration(
+        class_token, name, properties, methods = self._parse_type_declaration('class', True)
+        return self._make(
+            ClassDeclaration, class_token,
             name=name,
             properties=properties,
-            methods=methods,
-            line=class_token.line,
-            column=class_token.column
+            methods=methods
         )
     
     def parse_struct_declaration(self) -> StructDeclaration:
         """Parse: struct Name { properties... }"""
-        struct_token = self.advance()  # Skip 'struct'
-        name_token = self.expect(TokenType.IDENTIFIER)
-        name = name_token.value
+        struct_token, name, properties, _ = self._parse_type_declaration('struct', False)
+        return self._make(
+            StructDeclaration, struct_token,
+            name=name,
+            properties=properties
+        )
+    
+    def _parse_type_declaration(self, kind: str, allow_methods: bool) -> tuple:
+        """
+        Parse the shared shape of class and struct declarations.
+        
+        Args:
+            kind: Keyword being parsed, used in error messages
+            allow_methods: Whether method declarations may appear in the body
+            
+        Returns:
+            Tuple of (keyword token, name, properties, methods)
+        """
+        keyword_token = self.advance()  # Skip 'class' / 'struct'
+        name_token = self.expect(_TT_IDENTIFIER)
         
-        self.expect(TokenType.LBRACE)
+        self.expect(_TT_LBRACE)
         
         properties = []
+        methods = []
         
-        while not self.match(TokenType.RBRACE):
-            if self.match(TokenType.INT, TokenType.FLOAT):
-                prop = self.parse_variable_declaration()
-                properties.append(prop)
+        while not self.match(_TT_RBRACE):
+            # Property (variable declaration)
+            if self.match_mask(_MASK_TYPE_DECL):
+                properties.append(self.parse_variable_declaration())
+            elif allow_methods and self.match(_TT_METHOD):
+                methods.append(self.parse_method_declaration())
             else:
-                raise ParseError(f"Unexpected token in struct body: {self.current_token().type}")
+                raise ParseError(f"Unexpected token in {kind} body: {self.current_type().name}")
         
-        self.expect(TokenType.RBRACE)
+        self.expect(_TT_RBRACE)
         
-        return StructDeclaration(
-            name=name,
-            properties=properties,
-            line=struct_token.line,
-            column=struct_token.column
-        )
+        return keyword_token, name_token.value, properties, methods
     
     def parse_method_declaration(self) -> MethodDeclaration:
         """Parse: method name(params) { body }"""
         method_token = self.advance()  # Skip 'method'
-        name_token = self.expect(TokenType.IDENTIFIER)
+        name_token = self.expect(_TT_IDENTIFIER)
         name = name_token.value
         
-        self.expect(TokenType.LPAREN)
+        self.expect(_TT_LPAREN)
         params = []
         
-        while not self.match(TokenType.RPAREN):
-            param_token = self.expect(TokenType.IDENTIFIER)
+        while not self.match(_TT_RPAREN):
+            param_token = self.expect(_TT_IDENTIFIER)
             params.append(param_token.value)
-            if self.match(TokenType.COMMA):
+            if self.match(_TT_COMMA):
                 self.advance()
         
-        self.expect(TokenType.RPAREN)
-        self.expect(TokenType.LBRACE)
-        body = self.parse_block()
-        self.expect(TokenType.RBRACE)
+        self.expect(_TT_RPAREN)
+        body = self._parse_brace_block()
         
-        return MethodDeclaration(
+        return self._make(
+            MethodDeclaration, method_token,
             name=name,
             params=params,
-            body=body,
-            line=method_token.line,
-            column=method_token.column
+            body=body
         )
     
     def parse_label_declaration(self) -> LabelDeclaration:
         """Parse: label: name"""
         label_token = self.advance()  # Skip 'label'
-        self.expect(TokenType.COLON)
+        self.expect(_TT_COLON)
         
-        name_token = self.expect(TokenType.IDENTIFIER)
+        name_token = self.expect(_TT_IDENTIFIER)
         name = name_token.value
         
-        return LabelDeclaration(
-            name=name,
-            line=label_token.line,
-            column=label_token.column
-        )
+        return self._make(LabelDeclaration, label_token, name=name)
     
     def parse_goto_statement(self) -> GotoStatement:
         """Parse: goto label; or goto label if (condition);"""
         goto_token = self.advance()  # Skip 'goto'
         
-        label_token = self.expect(TokenType.IDENTIFIER)
+        label_token = self.expect(_TT_IDENTIFIER)
         label = label_token.value
         
         condition = None
-        if self.match(TokenType.IF):
+        if self.match(_TT_IF):
             self.advance()
-            self.expect(TokenType.LPAREN)
+            self.expect(_TT_LPAREN)
             condition = self.parse_expression()
-            self.expect(TokenType.RPAREN)
+            self.expect(_TT_RPAREN)
         
-        self.expect(TokenType.SEMICOLON)
+        self.expect(_TT_SEMICOLON)
         
-        return GotoStatement(
+        return self._make(
+            GotoStatement, goto_token,
             label=label,
-            condition=condition,
-            line=goto_token.line,
-            column=goto_token.column
-        )
-    
-    def parse_kill_statement(self) -> ExpressionStatement:
-        """Parse: kill();"""
-        kill_token = self.advance()
-        self.expect(TokenType.LPAREN)
-        self.expect(TokenType.RPAREN)
-        self.expect(TokenType.SEMICOLON)
-        
-        return ExpressionStatement(
-            expression=KillStatement(line=kill_token.line, column=kill_token.column),
-            line=kill_token.line,
-            column=kill_token.column
+            condition=condition
         )
     
     def parse_return_statement(self) -> ReturnStatement:
         """Parse: return;"""
         return_token = self.advance()
-        self.expect(TokenType.SEMICOLON)
+        self.expect(_TT_SEMICOLON)
         
-        return ReturnStatement(
-            line=return_token.line,
-            column=return_token.column
-        )
-    
-    def parse_wait_statement(self) -> ExpressionStatement:
-        """Parse: wait(time);"""
-        wait_token = self.advance()
-        self.expect(TokenType.LPAREN)
-        time = self.parse_expression()
-        self.expect(TokenType.RPAREN)
-        self.expect(TokenType.SEMICOLON)
-        
-        return ExpressionStatement(
-            expression=WaitStatement(time=time, line=wait_token.line, column=wait_token.column),
-            line=wait_token.line,
-            column=wait_token.column
-        )
+        return self._make(ReturnStatement, return_token)
     
-    def parse_waitfor_statement(self) -> ExpressionStatement:
-        """Parse: waitfor(condition);"""
-        waitfor_token = self.advance()
-        self.expect(TokenType.LPAREN)
-        condition = self.parse_expression()
-        self.expect(TokenType.RPAREN)
-        self.expect(TokenType.SEMICOLON)
+    def parse_simple_command(self) -> ASTNode:
+        """Parse a fixed-shape command from _SIMPLE_COMMANDS: keyword(operands);"""
+        command_token = self.advance()
+        node_class, operands = _SIMPLE_COMMANDS[command_token.type]
+        self.expect(_TT_LPAREN)
+        
+        fields = {}
+        for index, (field_name, kind) in enumerate(operands):
+            if index:
+                self.expect(_TT_COMMA)
+            if kind == _NAME:
+                fields[field_name] = self.expect(_TT_IDENTIFIER).value
+            else:
+                fields[field_name] = self.parse_expression()
         
-        return ExpressionStatement(
-            expression=WaitForStatement(condition=condition, line=waitfor_token.line, column=waitfor_token.column),
-            line=waitfor_token.line,
-            column=waitfor_token.column
-        )
+        self.expect(_TT_RPAREN)
+        self.expect(_TT_SEMICOLON)
+        
+        return self._make(node_class, command_token, **fields)
     
-    def parse_thread_statement(self) -> ExpressionStatement:
+    def parse_thread_statement(self) -> ThreadStatement:
         """Parse: thread(label, arg1, arg2);"""
         thread_token = self.advance()
-        self.expect(TokenType.LPAREN)
+        self.expect(_TT_LPAREN)
         
-        label_token = self.expect(TokenType.IDENTIFIER)
+        label_token = self.expect(_TT_IDENTIFIER)
         label = label_token.value
         
         args = []
-        while self.match(TokenType.COMMA):
+        while self.match(_TT_COMMA):
             self.advance()
             args.append(self.parse_expression())
         
-        self.expect(TokenType.RPAREN)
-        self.expect(TokenType.SEMICOLON)
+        self.expect(_TT_RPAREN)
+        self.expect(_TT_SEMICOLON)
         
-        return ExpressionStatement(
-            expression=ThreadStatement(label=label, args=args, line=thread_token.line, column=thread_token.column),
-            line=thread_token.line,
-            column=thread_token.column
-        )
-    
-    def parse_set_statement(self) -> ExpressionStatement:
-        """Parse: set(var, value);"""
-        set_token = self.advance()
-        self.expect(TokenType.LPAREN)
-        
-        var_token = self.expect(TokenType.IDENTIFIER)
-        variable = var_token.value
-        
-        self.expect(TokenType.COMMA)
-        value = self.parse_expression()
-        
-        self.expect(TokenType.RPAREN)
-        self.expect(TokenType.SEMICOLON)
-        
-        return ExpressionStatement(
-            expression=SetStatement(variable=variable, value=value, line=set_token.line, column=set_token.column),
-            line=set_token.line,
-            column=set_token.column
-        )
-    
-    def parse_push_statement(self) -> ExpressionStatement:
-        """Parse: push(value);"""
-        push_token = self.advance()
-        self.expect(TokenType.LPAREN)
-        value = self.parse_expression()
-        self.expect(TokenType.RPAREN)
-        self.expect(TokenType.SEMICOLON)
-        
-        return ExpressionStatement(
-            expression=PushStatement(value=value, line=push_token.line, column=push_token.column),
-            line=push_token.line,
-            column=push_token.column
-        )
-    
-    def parse_pop_statement(self) -> ExpressionStatement:
-        """Parse: pop(variable);"""
-        pop_token = self.advance()
-        self.expect(TokenType.LPAREN)
-        
-        var_token = self.expect(TokenType.IDENTIFIER)
-        variable = var_token.value
-        
-        self.expect(TokenType.RPAREN)
-        self.expect(TokenType.SEMICOLON)
-        
-        return ExpressionStatement(
-            expression=PopStatement(variable=variable, line=pop_token.line, column=pop_token.column),
-            line=pop_token.line,
-            column=pop_token.column
-        )
-    
-    def parse_peek_statement(self) -> ExpressionStatement:
-        """Parse: peek(variable);"""
-        peek_token = self.advance()
-        self.expect(TokenType.LPAREN)
-        
-        var_token = self.expect(TokenType.IDENTIFIER)
-        variable = var_token.value
-        
-        self.expect(TokenType.RPAREN)
-        self.expect(TokenType.SEMICOLON)
-        
-        return ExpressionStatement(
-            expression=PeekStatement(variable=variable, line=peek_token.line, column=peek_token.column),
-            line=peek_token.line,
-            column=peek_token.column
+        return self._make(
+            ThreadStatement, thread_token,
+            label=label,
+            args=args
         )
     
-    def parse_builtin_call(self) -> ExpressionStatement:
+    def parse_builtin_call(self) -> ASTNode:
         """Parse built-in function calls like spawnbot, moveto, etc."""
-        builtin_token = self.current_token()
-        builtin_type = builtin_token.type
-        self.advance()
-        
-        self.expect(TokenType.LPAREN)
-        args = []
-        
-        while not self.match(TokenType.RPAREN):
-            args.append(self.parse_expression())
-            if self.match(TokenType.COMMA):
+        builtin_token = self.advance()
+        node_class, names, rest_name = _BUILTIN_CALLS[builtin_token.type]
+        self.expect(_TT_LPAREN)
+        
+        # Arguments fill the named fields in order; missing ones stay None.
+        # Extra arguments are kept only by builtins with a variable tail.
+        fields = dict.fromkeys(names)
+        rest = [] if rest_name is not None else None
+        count = len(names)
+        index = 0
+        
+        while not self.match(_TT_RPAREN):
+            value = self.parse_expression()
+            if index < count:
+                fields[names[index]] = value
+            elif rest is not None:
+                rest.append(value)
+            index += 1
+            if self.match(_TT_COMMA):
                 self.advance()
         
-        self.expect(TokenType.RPAREN)
-        self.expect(TokenType.SEMICOLON)
-        
-        # Create appropriate node based on builtin type
-        if builtin_type == TokenType.SPAWNBOT:
-            node = SpawnBotCall(
-                template=args[0] if len(args) > 0 else None,
-                location=args[1] if len(args) > 1 else None,
-                attributes=args[2:] if len(args) > 2 else [],
-                line=builtin_token.line,
-                column=builtin_token.column
-            )
-        elif builtin_type == TokenType.MOVETO:
-            node = MoveToCall(
-                prop=args[0] if len(args) > 0 else None,
-                location=args[1] if len(args) > 1 else None,
-                line=builtin_token.line,
-                column=builtin_token.column
-            )
-        elif builtin_type == TokenType.ANIMATE:
-            node = AnimateCall(
-                prop=args[0] if len(args) > 0 else None,
-                location=args[1] if len(args) > 1 else None,
-                time=args[2] if len(args) > 2 else None,
-                line=builtin_token.line,
-                column=builtin_token.column
-            )
-        elif builtin_type == TokenType.DELETE:
-            node = DeleteCall(
-                prop=args[0] if len(args) > 0 else None,
-                line=builtin_token.line,
-                column=builtin_token.column
-            )
-        else:
-            raise ParseError(f"Unknown builtin: {builtin_type}")
+        self.expect(_TT_RPAREN)
+        self.expect(_TT_SEMICOLON)
         
-        return ExpressionStatement(
-            expression=node,
-            line=builtin_token.line,
-            column=builtin_token.column
-        )
+        if rest is not None:
+            fields[rest_name] = rest
+        return self._make(node_class, builtin_token, **fields)
     
     def parse_for_loop(self) -> ForLoop:
         """Parse: for (init; condition; increment) { body }"""
         for_token = self.advance()  # Skip 'for'
-        self.expect(TokenType.LPAREN)
+        self.expect(_TT_LPAREN)
         
         # Parse init (can be variable declaration or expression/assignment)
         init = None
-        if not self.match(TokenType.SEMICOLON):
-            if self.match(TokenType.INT, TokenType.FLOAT):
+        if not self.match(_TT_SEMICOLON):
+            if self.match_mask(_MASK_TYPE_DECL):
                 # For loop variable declaration - parse inline without semicolon
                 type_token = self.advance()
                 var_type = type_token.value
-                name_token = self.expect(TokenType.IDENTIFIER)
+                name_token = self.expect(_TT_IDENTIFIER)
                 name = name_token.value
                 value = None
-                if self.match(TokenType.ASSIGN):
+                if self.match(_TT_ASSIGN):
                     self.advance()
                     value = self.parse_expression()
-                init = VariableDeclaration(
+                init = self._make(
+                    VariableDeclaration, type_token,
                     var_type=var_type,
                     name=name,
-                    value=value,
-                    line=type_token.line,
-                    column=type_token.column
+                    value=value
                 )
             else:
                 init = self.parse_expression()
-        self.expect(TokenType.SEMICOLON)
+        self.expect(_TT_SEMICOLON)
         
         # Parse condition
         condition = None
-        if not self.match(TokenType.SEMICOLON):
+        if not self.match(_TT_SEMICOLON):
             condition = self.parse_expression()
-        self.expect(TokenType.SEMICOLON)
+        self.expect(_TT_SEMICOLON)
         
         # Parse increment
         increment = None
-        if not self.match(TokenType.RPAREN):
+        if not self.match(_TT_RPAREN):
             increment = self.parse_expression()
-        self.expect(TokenType.RPAREN)
+        self.expect(_TT_RPAREN)
         
         # Parse body
-        self.expect(TokenType.LBRACE)
-        body = self.parse_block()
-        self.expect(TokenType.RBRACE)
+        body = self._parse_brace_block()
         
-        return ForLoop(
+        return self._make(
+            ForLoop, for_token,
             init=init,
             condition=condition,
             increment=increment,
-            body=body,
-            line=for_token.line,
-            column=for_token.column
+            body=body
         )
     
     def parse_switch_statement(self) -> SwitchStatement:
         """Parse: switch (expr) { case val: ... default: ... }"""
         switch_token = self.advance()  # Skip 'switch'
-        self.expect(TokenType.LPAREN)
+        self.expect(_TT_LPAREN)
         expression = self.parse_expression()
-        self.expect(TokenType.RPAREN)
-        self.expect(TokenType.LBRACE)
+        self.expect(_TT_RPAREN)
+        self.expect(_TT_LBRACE)
         
         cases = []
         default_case = None
         
-        while not self.match(TokenType.RBRACE):
-            if self.match(TokenType.CASE):
+        while not self.match(_TT_RBRACE):
+            if self.match(_TT_CASE):
                 case_token = self.advance()  # Skip 'case'
                 value = self.parse_expression()
-                self.expect(TokenType.COLON)
+                self.expect(_TT_COLON)
                 
                 # Parse statements until next case/default/break/}
                 statements = []
-                while not self.match(TokenType.CASE, TokenType.DEFAULT, TokenType.RBRACE):
-                    if self.match(TokenType.BREAK):
+                while not self.match_mask(_MASK_CASE_END):
+                    if self.match(_TT_BREAK):
                         self.advance()
-                        self.expect(TokenType.SEMICOLON)
+                        self.expect(_TT_SEMICOLON)
                         break
                     stmt = self.parse_statement()
                     if stmt:
                         statements.append(stmt)
                 
-                cases.append(CaseStatement(
+                cases.append(self._make(
+                    CaseStatement, case_token,
                     value=value,
-                    statements=statements,
-                    line=case_token.line,
-                    column=case_token.column
+                    statements=statements
                 ))
             
-            elif self.match(TokenType.DEFAULT):
+            elif self.match(_TT_DEFAULT):
                 default_token = self.advance()  # Skip 'default'
-                self.expect(TokenType.COLON)
+                self.expect(_TT_COLON)
                 
                 # Parse statements until }
                 statements = []
-                while not self.match(TokenType.RBRACE):
-                    if self.match(TokenType.BREAK):
+                while not self.match(_TT_RBRACE):
+                    if self.match(_TT_BREAK):
                         self.advance()
-                        self.expect(TokenType.SEMICOLON)
+                        self.expect(_TT_SEMICOLON)
                         break
                     stmt = self.parse_statement()
                     if stmt:
                         statements.append(stmt)
                 
-                default_case = DefaultCase(
-                    statements=statements,
-                    line=default_token.line,
-                    column=default_token.column
-                )
+                default_case = self._make(DefaultCase, default_token, statements=statements)
             else:
                 break
         
-        self.expect(TokenType.RBRACE)
+        self.expect(_TT_RBRACE)
         
-        return SwitchStatement(
+        return self._make(
+            SwitchStatement, switch_token,
             expression=expression,
             cases=cases,
-            default_case=default_case,
-            line=switch_token.line,
-            column=switch_token.column
+            default_case=default_case
         )
     
     def parse_if_statement(self) -> IfStatement:
         """Parse: if (condition) { ... } else { ... }"""
         if_token = self.advance()  # Skip 'if'
         
-        self.expect(TokenType.LPAREN)
+        self.expect(_TT_LPAREN)
         condition = self.parse_expression()
-        self.expect(TokenType.RPAREN)
+        self.expect(_TT_RPAREN)
         
-        self.expect(TokenType.LBRACE)
-        then_body = self.parse_block()
-        self.expect(TokenType.RBRACE)
+        then_body = self._parse_brace_block()
         
         else_body = None
-        if self.match(TokenType.ELSE):
+        if self.match(_TT_ELSE):
             self.advance()  # Skip 'else'
-            self.expect(TokenType.LBRACE)
-            else_body = self.parse_block()
-            self.expect(TokenType.RBRACE)
+            else_body = self._parse_brace_block()
         
-        return IfStatement(
+        return self._make(
+            IfStatement, if_token,
             condition=condition,
             then_body=then_body,
-            else_body=else_body,
-            line=if_token.line,
-            column=if_token.column
+            else_body=else_body
         )
     
     def parse_while_statement(self) -> WhileStatement:
         """Parse: while (condition) { ... }"""
         while_token = self.advance()  # Skip 'while'
         
-        self.expect(TokenType.LPAREN)
+        self.expect(_TT_LPAREN)
         condition = self.parse_expression()
-        self.expect(TokenType.RPAREN)
+        self.expect(_TT_RPAREN)
         
-        self.expect(TokenType.LBRACE)
-        body = self.parse_block()
-        self.expect(TokenType.RBRACE)
+        body = self._parse_brace_block()
         
-        return WhileStatement(
+        return self._make(
+            WhileStatement, while_token,
             condition=condition,
-            body=body,
-            line=while_token.line,
-            column=while_token.column
+            body=body
         )
     
     def parse_block(self) -> List[ASTNode]:
         """Parse a block of statements."""
         statements = []
         
-        while not self.match(TokenType.RBRACE, TokenType.EOF):
-            self.skip_comments()
-            if self.match(TokenType.RBRACE, TokenType.EOF):
-                break
-            
+        while not self.match_mask(_MASK_BLOCK_END):
             stmt = self.parse_statement()
             if stmt:
                 statements.append(stmt)
         
         return statements
     
+    def _parse_brace_block(self) -> List[ASTNode]:
+        """Parse: { statements }"""
+        self.expect(_TT_LBRACE)
+        statements = self.parse_block()
+        self.expect(_TT_RBRACE)
+        return statements
+    
     def parse_expression_statement(self) -> ExpressionStatement:
         """Parse an expression followed by a semicolon."""
         expr = self.parse_expression()
-        self.expect(TokenType.SEMICOLON)
+        self.expect(_TT_SEMICOLON)
         
-        return ExpressionStatement(
-            expression=expr,
-            line=expr.line if hasattr(expr, 'line') else 0,
-            column=expr.column if hasattr(expr, 'column') else 0
-        )
+        return self._make(ExpressionStatement, expr, expression=expr)
     
     # Expression parsing remains the same
     def parse_expression(self) -> ASTNode:
         """Parse an expression."""
-        return self.parse_ternary()
+        memo = self._memo
+        if memo is None:
+            return self.parse_ternary()
+        
+        key = (_RULE_EXPRESSION, self.pos)
+        cached = memo.get(key)
+        if cached is not None:
+            expr, self.pos = cached
+            return expr
+        
+        expr = self.parse_ternary()
+        memo[key] = (expr, self.pos)
+        return expr
     
     def parse_ternary(self) -> ASTNode:
         """Parse ternary operator: condition ? true_val : false_val"""
-        expr = self.parse_logical_or()
+        expr = self.parse_binary()
         
-        if self.match(TokenType.QUESTION):
-            self.advance()  # Skip ?
+        if self._types[self.pos] == _TT_QUESTION:
+            self.pos += 1  # Skip ?
             true_value = self.parse_expression()
-            self.expect(TokenType.COLON)
+            self.expect(_TT_COLON)
             false_value = self.parse_expression()
             return TernaryExpression(
                 condition=expr,
                 true_value=true_value,
                 false_value=false_value,
-                line=expr.line if hasattr(expr, 'line') else 0,
-                column=expr.column if hasattr(expr, 'column') else 0
+                line=expr.line,
+                column=expr.column
             )
         
         return expr
     
-    def parse_logical_or(self) -> ASTNode:
-        """Parse logical OR: a || b"""
-        left = self.parse_logical_and()
+    def parse_binary(self, min_precedence: int = 1) -> ASTNode:
+        """
+        Parse binary operators by precedence climbing.
         
-        while self.match(TokenType.OR):
-            op_token = self.advance()
-            right = self.parse_logical_and()
-            left = BinaryOp(
-                left=left,
-                operator=op_token.value,
-                right=right,
-                line=op_token.line,
-                column=op_token.column
-            )
-        
-        return left
-    
-    def parse_logical_and(self) -> ASTNode:
-        """Parse logical AND: a && b"""
-        left = self.parse_equality()
-        
-        while self.match(TokenType.AND):
-            op_token = self.advance()
-            right = self.parse_equality()
-            left = BinaryOp(
-                left=left,
-                operator=op_token.value,
-                right=right,
-                line=op_token.line,
-                column=op_token.column
-            )
-        
-        return left
-    
-    def parse_equality(self) -> ASTNode:
-        """Parse equality: a == b, a != b"""
-        left = self.parse_comparison()
+        One loop handles every level in _BINARY_PRECEDENCE, so an operand
+        with no operator after it costs a single dict lookup instead of a
+        call per precedence level. All operators are left-associative.
         
-        while self.match(TokenType.EQ, TokenType.NEQ):
-            op_token = self.advance()
-            right = self.parse_comparison()
-            left = BinaryOp(
-                left=left,
-                operator=op_token.value,
-                right=right,
-                line=op_token.line,
-                column=op_token.column
-            )
-        
-        return left
-    
-    def parse_comparison(self) -> ASTNode:
-        """Parse comparison: a < b, a > b, a <= b, a >= b"""
-        left = self.parse_additive()
-        
-        while self.match(TokenType.LT, TokenType.GT, TokenType.LTE, TokenType.GTE):
-            op_token = self.advance()
-            right = self.parse_additive()
-            left = BinaryOp(
-                left=left,
-                operator=op_token.value,
-                right=right,
-                line=op_token.line,
-                column=op_token.column
-            )
-        
-        return left
-    
-    def parse_additive(self) -> ASTNode:
-        """Parse addition/subtraction: a + b, a - b"""
-        left = self.parse_multiplicative()
-        
-        while self.match(TokenType.PLUS, TokenType.MINUS):
-            op_token = self.advance()
-            right = self.parse_multiplicative()
-            left = BinaryOp(
-                left=left,
-                operator=op_token.value,
-                right=right,
-                line=op_token.line,
-                column=op_token.column
-            )
-        
-        return left
-    
-    def parse_multiplicative(self) -> ASTNode:
-        """Parse multiplication/division: a * b, a / b"""
+        Args:
+            min_precedence: Lowest operator precedence this call may consume
+        """
         left = self.parse_unary()
+        precedence_of = _BINARY_PRECEDENCE.get
+        tokens = self.tokens
+        types = self._types
         
-        while self.match(TokenType.MULTIPLY, TokenType.DIVIDE):
-            op_token = self.advance()
-            right = self.parse_unary()
+        while True:
+            pos = self.pos
+            precedence = precedence_of(types[pos], 0)
+            if precedence < min_precedence:
+                return left
+            
+            # An operator is never EOF, so stepping past it needs no bound check
+            op_token = tokens[pos]
+            self.pos = pos + 1
+            right = self.parse_binary(precedence + 1)
+            
+            value = None
+            if self.fold_constants and op_token.type in _FOLDABLE_OPS:
+                left_value = _numeric_value(left)
+                right_value = _numeric_value(right)
+                if left_value is not None and right_value is not None:
+                    value = _FOLDABLE_OPS[op_token.type](left_value, right_value)
+            
+            # A float result may be inf or nan, which StateScript cannot
+            # spell, so those stay unfolded (ints are exact and never are)
+            if value is not None and (type(value) is int or math.isfinite(value)):
+                left = Literal(
+                    value=abs(value),
+                    literal_type='float' if type(value) is float else 'int',
+                    line=op_token.line,
+                    column=op_token.column
+                )
+                if value < 0:
+                    # Shaped like a written '-N', so it renders as one
+                    left = UnaryOp(
+                        operator='-',
+                        operand=left,
+                        is_postfix=False,
+                        line=op_token.line,
+                        column=op_token.column
+                    )
+                continue
+            
             left = BinaryOp(
                 left=left,
                 operator=op_token.value,
@@ -939,12 +864,10 @@ class Parser:
                 line=op_token.line,
                 column=op_token.column
             )
-        
-        return left
     
     def parse_unary(self) -> ASTNode:
         """Parse unary operators: !x, -x, ++x, --x"""
-        if self.match(TokenType.NOT, TokenType.MINUS, TokenType.INCREMENT, TokenType.DECREMENT):
+        if self.match_mask(_MASK_PREFIX_OP):
             op_token = self.advance()
             operand = self.parse_unary()
             return UnaryOp(
@@ -960,74 +883,20 @@ class Parser:
     def parse_postfix(self) -> ASTNode:
         """Parse postfix operators and function calls."""
         expr = self.parse_primary()
+        types = self._types
+        dispatch = self._POSTFIX_DISPATCH
         
-        while True:
-            # Array indexing: arr[index]
-            if self.match(TokenType.LBRACKET):
-                self.advance()  # Skip [
-                index = self.parse_expression()
-                self.expect(TokenType.RBRACKET)
-                expr = ArrayAccess(
-                    array=expr,
-                    index=index,
-                    line=expr.line if hasattr(expr, 'line') else 0,
-                    column=expr.column if hasattr(expr, 'column') else 0
-                )
-            
-            # Member access: obj.property
-            elif self.match(TokenType.DOT):
-                self.advance()  # Skip .
-                member_token = self.expect(TokenType.IDENTIFIER)
-                expr = MemberAccess(
-                    object=expr,
-                    member=member_token.value,
-                    line=expr.line if hasattr(expr, 'line') else 0,
-                    column=expr.column if hasattr(expr, 'column') else 0
-                )
-            
-            # Function call
-            elif self.match(TokenType.LPAREN):
-                self.advance()  # Skip (
-                args = []
-                
-                while not self.match(TokenType.RPAREN):
-                    args.append(self.parse_expression())
-                    if self.match(TokenType.COMMA):
-                        self.advance()
-                
-                self.expect(TokenType.RPAREN)
-                
-                # Convert identifier to function call
-                if isinstance(expr, Identifier):
-                    expr = FunctionCall(
-                        name=expr.name,
-                        args=args,
-                        line=expr.line,
-                        column=expr.column
-                    )
-                else:
-                    raise ParseError("Only identifiers can be called as functions")
-                
-            # Postfix increment/decrement
-            elif self.match(TokenType.INCREMENT, TokenType.DECREMENT):
-                op_token = self.advance()
-                expr = UnaryOp(
-                    operator=op_token.value,
-                    operand=expr,
-                    is_postfix=True,
-                    line=op_token.line,
-                    column=op_token.column
-                )
-            
-            else:
-                break
+        suffix = dispatch.get(types[self.pos])
+        while suffix is not None:
+            expr = suffix(self, expr)
+            suffix = dispatch.get(types[self.pos])
         
         # Check for simple assignment
-        if self.match(TokenType.ASSIGN):
-            self.advance()  # Skip =
+        if types[self.pos] == _TT_ASSIGN:
+            self.pos += 1  # Skip =
             value = self.parse_expression()
             
-            if isinstance(expr, Identifier):
+            if type(expr) is Identifier:
                 expr = Assignment(
                     target=expr.name,
                     value=value,
@@ -1039,69 +908,180 @@ class Parser:
         
         return expr
     
+    def _suffix_index(self, expr: ASTNode) -> ArrayAccess:
+        """Parse array indexing: arr[index]"""
+        self.advance()  # Skip [
+        index = self.parse_expression()
+        self.expect(_TT_RBRACKET)
+        return ArrayAccess(
+            array=expr,
+            index=index,
+            line=expr.line,
+            column=expr.column
+        )
+    
+    def _suffix_member(self, expr: ASTNode) -> MemberAccess:
+        """Parse member access: obj.property"""
+        self.advance()  # Skip .
+        member_token = self.expect(_TT_IDENTIFIER)
+        return MemberAccess(
+            object=expr,
+            member=member_token.value,
+            line=expr.line,
+            column=expr.column
+        )
+    
+    def _suffix_call(self, expr: ASTNode) -> FunctionCall:
+        """Parse a function call: name(args)"""
+        self.advance()  # Skip (
+        args = []
+        types = self._types
+        
+        # Neither ',' nor ')' can be EOF, so pos is bumped directly
+        while types[self.pos] != _TT_RPAREN:
+            args.append(self.parse_expression())
+            if types[self.pos] == _TT_COMMA:
+                self.pos += 1
+        
+        self.pos += 1  # Skip )
+        
+        # Convert identifier to function call
+        if type(expr) is not Identifier:
+            raise ParseError("Only identifiers can be called as functions")
+        return FunctionCall(
+            name=expr.name,
+            args=args,
+            line=expr.line,
+            column=expr.column
+        )
+    
+    def _suffix_step(self, expr: ASTNode) -> UnaryOp:
+        """Parse postfix increment/decrement: x++, x--"""
+        op_token = self.advance()
+        return UnaryOp(
+            operator=op_token.value,
+            operand=expr,
+            is_postfix=True,
+            line=op_token.line,
+            column=op_token.column
+        )
+    
     def parse_primary(self) -> ASTNode:
         """Parse primary expressions: literals, identifiers, parenthesized expressions"""
-        token = self.current_token()
-        
-        # Number literal
-        if self.match(TokenType.NUMBER):
-            self.advance()
-            literal_type = 'float' if isinstance(token.value, float) else 'int'
-            return Literal(
-                value=token.value,
-                literal_type=literal_type,
-                line=token.line,
-                column=token.column
-            )
-        
-        # String literal
-        if self.match(TokenType.STRING):
-            self.advance()
-            return Literal(
-                value=token.value,
-                literal_type='string',
-                line=token.line,
-                column=token.column
-            )
-        
-        # Array literal: [1, 2, 3]
-        if self.match(TokenType.LBRACKET):
-            return self.parse_array_literal()
-        
-        # Identifier
-        if self.match(TokenType.IDENTIFIER):
-            self.advance()
-            return Identifier(
-                name=token.value,
-                line=token.line,
-                column=token.column
+        token = self.tokens[self.pos]
+        parser = self._PRIMARY_DISPATCH.get(self._types[self.pos])
+        if parser is None:
+            raise ParseError(
+                f"Unexpected token {token.type.name} at {token.line}:{token.column}"
             )
-        
-        # Parenthesized expression
-        if self.match(TokenType.LPAREN):
-            self.advance()  # Skip (
-            expr = self.parse_expression()
-            self.expect(TokenType.RPAREN)
-            return expr
-        
-        raise ParseError(
-            f"Unexpected token {token.type.name} at {token.line}:{token.column}"
+        # token is never EOF here, so handlers may step over it with pos += 1
+        return parser(self, token)
+    
+    def _primary_number(self, token: Token) -> Literal:
+        """Parse a number literal"""
+        self.pos += 1
+        literal_type = 'float' if type(token.value) is float else 'int'
+        return Literal(
+            value=token.value,
+            literal_type=literal_type,
+            line=token.line,
+            column=token.column
+        )
+    
+    def _primary_string(self, token: Token) -> Literal:
+        """Parse a string literal"""
+        self.pos += 1
+        return Literal(
+            value=token.value,
+            literal_type='string',
+            line=token.line,
+            column=token.column
+        )
+    
+    def _primary_array(self, token: Token) -> ArrayLiteral:
+        """Parse an array literal: [1, 2, 3]"""
+        return self.parse_array_literal()
+    
+    def _primary_identifier(self, token: Token) -> Identifier:
+        """Parse an identifier"""
+        self.pos += 1
+        return Identifier(
+            name=token.value,
+            line=token.line,
+            column=token.column
         )
     
+    def _primary_group(self, token: Token) -> ASTNode:
+        """Parse a parenthesized expression"""
+        self.advance()  # Skip (
+        expr = self.parse_expression()
+        self.expect(_TT_RPAREN)
+        return expr
+    
     def parse_array_literal(self) -> ArrayLiteral:
         """Parse array literal: [1, 2, 3]"""
         bracket_token = self.advance()  # Skip [
         
         elements = []
-        while not self.match(TokenType.RBRACKET):
+        types = self._types
+        while types[self.pos] != _TT_RBRACKET:
             elements.append(self.parse_expression())
-            if self.match(TokenType.COMMA):
-                self.advance()
+            if types[self.pos] == _TT_COMMA:
+                self.pos += 1
         
-        self.expect(TokenType.RBRACKET)
+        self.pos += 1  # Skip ]
         
         return ArrayLiteral(
             elements=elements,
             line=bracket_token.line,
             column=bracket_token.column
         )
+    
+    # Statement parsers keyed by the leading token type; built once per class
+    _STATEMENT_DISPATCH = {
+        # Only reached when comments are kept
+        TokenType.COMMENT: parse_comment,
+        TokenType.CONST: parse_const_declaration,
+        TokenType.INT: parse_variable_declaration,
+        TokenType.FLOAT: parse_variable_declaration,
+        TokenType.FUNCTION: parse_function_declaration,
+        TokenType.CLASS: parse_class_declaration,
+        TokenType.STRUCT: parse_struct_declaration,
+        TokenType.LABEL: parse_label_declaration,
+        TokenType.GOTO: parse_goto_statement,
+        TokenType.IF: parse_if_statement,
+        TokenType.WHILE: parse_while_statement,
+        TokenType.FOR: parse_for_loop,
+        TokenType.SWITCH: parse_switch_statement,
+        TokenType.RETURN: parse_return_statement,
+        TokenType.KILL: parse_simple_command,
+        TokenType.WAIT: parse_simple_command,
+        TokenType.WAITFOR: parse_simple_command,
+        TokenType.THREAD: parse_thread_statement,
+        TokenType.SET: parse_command_or_expression,
+        TokenType.PUSH: parse_command_or_expression,
+        TokenType.POP: parse_command_or_expression,
+        TokenType.PEEK: parse_command_or_expression,
+        TokenType.SPAWNBOT: parse_builtin_call,
+        TokenType.MOVETO: parse_builtin_call,
+        TokenType.ANIMATE: parse_builtin_call,
+        TokenType.DELETE: parse_builtin_call,
+        TokenType.RAW: parse_raw_block,
+    }
+    
+    # Expression heads and postfix suffixes, keyed the same way
+    _PRIMARY_DISPATCH = {
+        TokenType.NUMBER: _primary_number,
+        TokenType.STRING: _primary_string,
+        TokenType.LBRACKET: _primary_array,
+        TokenType.IDENTIFIER: _primary_identifier,
+        TokenType.LPAREN: _primary_group,
+    }
+    
+    _POSTFIX_DISPATCH = {
+        TokenType.LBRACKET: _suffix_index,
+        TokenType.DOT: _suffix_member,
+        TokenType.LPAREN: _suffix_call,
+        TokenType.INCREMENT: _suffix_step,
+        TokenType.DECREMENT: _suffix_step,
+    }
@@ -4,10 +4,31 @@ Type Checker for ClearScript
 Performs static type checking on the AST before code generation.
 """
 
+from functools import partial
 from typing import Dict, List, Optional
 from .ast_nodes import *
 
 
+# Types are small ints: the low bits name a base type and ARRAY_BIT marks
+# an array of it. Names are only rebuilt when formatting an error.
+TYPE_INT = 0
+TYPE_FLOAT = 1
+TYPE_STRING = 2
+ARRAY_BIT = 1 << 16
+# Type of an expression whose error has already been reported. It is
+# compatible with everything, so one mistake yields one message.
+TYPE_ERROR = -1
+
+# Operator groups checked by infer_type
+_ARITHMETIC_OPS = frozenset(('+', '-', '*', '/', '%'))
+_COMPARISON_OPS = frozenset(('<', '>', '<=', '>=', '==', '!='))
+_LOGICAL_OPS = frozenset(('&&', '||'))
+_STEP_OPS = frozenset(('++', '--'))
+
+# Built-in type names, indexed by their code
+_BUILTIN_TYPE_NAMES = ('int', 'float', 'string')
+
+
 class TypeCheckError(Exception):
     """Type checking error"""
     def __init__(self, message: str, line: int = 0):
@@ -21,94 +42,140 @@ class TypeChecker:
     
     def __init__(self, ast: Program):
         self.ast = ast
-        self.symbol_table: Dict[str, str] = {}  # name -> type
+        self.symbol_table: Dict[str, int] = {}  # name -> type code
         self.errors: List[TypeCheckError] = []
         self.current_function = None
+        self._work = []  # Pending statements and deferred steps, see visit()
+        # Type name <-> code registry. Kept per checker so that class names
+        # from earlier programs (e.g. in a batch) never use up codes here
+        self._type_names: List[str] = list(_BUILTIN_TYPE_NAMES)
+        self._type_codes: Dict[str, int] = {name: code for code, name in enumerate(_BUILTIN_TYPE_NAMES)}
     
     def check(self) -> List[TypeCheckError]:
         """Run type checking and return list of errors"""
-        try:
-            self.visit(self.ast)
-        except TypeCheckError as e:
-            self.errors.append(e)
-        
+        self.visit(self.ast)
         return self.errors
     
-    def visit(self, node: ASTNode):
-        """Dispatch to appropriate visitor method"""
-        if isinstance(node, Program):
-            for stmt in node.statements:
-                self.visit(stmt)
-        
-        elif isinstance(node, VariableDeclaration):
-            self.visit_variable_declaration(node)
+    def type_code(self, name: str) -> int:
+        """
+        Return the integer code for a type name such as 'float' or 'int[]'.
         
-        elif isinstance(node, ArrayDeclaration):
-            self.visit_array_declaration(node)
+        Names outside the built-in types (e.g. class names) are given a new
+        code the first time this checker sees them.
         
-        elif isinstance(node, Assignment):
-            self.visit_assignment(node)
-        
-        elif isinstance(node, IfStatement):
-            self.visit_if_statement(node)
-        
-        elif isinstance(node, WhileStatement):
-            self.visit_while_statement(node)
-        
-        elif isinstance(node, ForLoop):
-            self.visit_for_loop(node)
-        
-        elif isinstance(node, FunctionDeclaration):
-            self.visit_function_declaration(node)
-        
-        elif isinstance(node, ExpressionStatement):
-            self.infer_type(node.expression)
+        Raises:
+            TypeCheckError: If a new name would need a code of ARRAY_BIT or more
+        """
+        code = self._type_codes.get(name)
+        if code is None:
+            if name.endswith('[]'):
+                return self.type_code(name[:-2]) | ARRAY_BIT
+            code = len(self._type_names)
+            if code >= ARRAY_BIT:
+                # The code would read as an array type
+                raise TypeCheckError(f"Too many distinct type names (limit {ARRAY_BIT})")
+            self._type_codes[name] = code
+            self._type_names.append(name)
+        return code
+    
+    def type_name(self, code: int) -> str:
+        """Return the display name for an integer type code."""
+        name = self._type_names[code & ~ARRAY_BIT]
+        return f"{name}[]" if code & ARRAY_BIT else name
+    
+    def error(self, message: str, line: int) -> int:
+        """Record an error and return TYPE_ERROR for the offending expression."""
+        self.errors.append(TypeCheckError(message, line))
+        return TYPE_ERROR
+    
+    def undefined_variable(self, name: str, line: int) -> int:
+        """Report an undefined variable once, then treat it as TYPE_ERROR."""
+        self.symbol_table[name] = TYPE_ERROR
+        return self.error(f"Undefined variable '{name}'", line)
+    
+    def visit(self, node: ASTNode):
+        """
+        Check a statement and everything it schedules.
         
-        # Ignore other node types for now
+        Visitors push their child statements onto a shared work stack
+        instead of recursing, so nesting depth costs no Python stack
+        frames. Each call drains only the items pushed above its own
+        starting point. Expressions are still inferred recursively.
+        """
+        work = self._work
+        base = len(work)
+        work.append(node)
+        dispatch = self._VISIT_DISPATCH
+        while len(work) > base:
+            item = work.pop()
+            visitor = dispatch.get(type(item))
+            # Ignore other node types for now
+            if visitor is not None:
+                visitor(self, item)
+    
+    def _schedule(self, items: list):
+        """Queue statements and deferred steps to be checked in order."""
+        self._work.extend(reversed(items))
+    
+    def _run_deferred(self, step: partial):
+        """Run a step that must wait until earlier statements are checked."""
+        step()
+    
+    def visit_program(self, node: Program):
+        """Check every top-level statement"""
+        self._schedule(node.statements)
+    
+    def visit_expression_statement(self, node: ExpressionStatement):
+        """Check an expression used as a statement"""
+        self.infer_type(node.expression)
     
     def visit_variable_declaration(self, node: VariableDeclaration):
         """Check variable declaration"""
         # Register variable type
-        self.symbol_table[node.name] = node.var_type
+        var_type = self.type_code(node.var_type)
+        self.symbol_table[node.name] = var_type
         
         # Check initializer type if present
         if node.value:
             value_type = self.infer_type(node.value)
-            if not self.types_compatible(node.var_type, value_type):
-                raise TypeCheckError(
-                    f"Cannot initialize variable '{node.name}' of type '{node.var_type}' with value of type '{value_type}'",
+            if not self.types_compatible(var_type, value_type):
+                self.error(
+                    f"Cannot initialize variable '{node.name}' of type '{node.var_type}' "
+                    f"with value of type '{self.type_name(value_type)}'",
                     node.line
                 )
     
     def visit_array_declaration(self, node: ArrayDeclaration):
         """Check array declaration"""
-        array_type = f"{node.elem_type}[]"
-        self.symbol_table[node.name] = array_type
+        elem_type = self.type_code(node.elem_type)
+        self.symbol_table[node.name] = elem_type | ARRAY_BIT
         
         # Check array literal elements if present
         if node.initializer and isinstance(node.initializer, ArrayLiteral):
+            infer_type = self.infer_type
             for elem in node.initializer.elements:
-                elem_type = self.infer_type(elem)
-                if not self.types_compatible(node.elem_type, elem_type):
-                    raise TypeCheckError(
-                        f"Array element type '{elem_type}' does not match array type '{node.elem_type}[]'",
+                value_type = infer_type(elem)
+                # Exact matches are the common case; skip the call for them
+                if value_type != elem_type and not self.types_compatible(elem_type, value_type):
+                    self.error(
+                        f"Array element type '{self.type_name(value_type)}' "
+                        f"does not match array type '{node.elem_type}[]'",
                         node.line
                     )
+                    break
     
     def visit_assignment(self, node: Assignment):
         """Check assignment type compatibility"""
-        if node.target not in self.symbol_table:
-            raise TypeCheckError(
-                f"Undefined variable '{node.target}'",
-                node.line
-            )
+        target_type = self.symbol_table.get(node.target)
+        if target_type is None:
+            target_type = self.undefined_variable(node.target, node.line)
         
-        target_type = self.symbol_table[node.target]
         value_type = self.infer_type(node.value)
         
         if not self.types_compatible(target_type, value_type):
-            raise TypeCheckError(
-                f"Cannot assign value of type '{value_type}' to variable '{node.target}' of type '{target_type}'",
+            self.error(
+                f"Cannot assign value of type '{self.type_name(value_type)}' "
+                f"to variable '{node.target}' of type '{self.type_name(target_type)}'",
                 node.line
             )
     
@@ -117,131 +184,158 @@ class TypeChecker:
         # Condition should be boolean-like (we accept any type for now)
         self.infer_type(node.condition)
         
-        for stmt in node.then_body:
-            self.visit(stmt)
-        
         if node.else_body:
-            for stmt in node.else_body:
-                self.visit(stmt)
+            self._schedule(node.then_body + node.else_body)
+        else:
+            self._schedule(node.then_body)
     
     def visit_while_statement(self, node: WhileStatement):
         """Check while statement"""
         self.infer_type(node.condition)
-        
-        for stmt in node.body:
-            self.visit(stmt)
+        self._schedule(node.body)
     
     def visit_for_loop(self, node: ForLoop):
         """Check for loop"""
-        if node.init:
-            self.visit(node.init)
+        # visit() ignores a missing init, so no None check is needed
+        self.visit(node.init)
         if node.condition:
             self.infer_type(node.condition)
         if node.increment:
             self.infer_type(node.increment)
-        
-        for stmt in node.body:
-            self.visit(stmt)
+        self._schedule(node.body)
     
     def visit_function_declaration(self, node: FunctionDeclaration):
         """Check function declaration"""
         # Register function (simplified - no full signature tracking)
         self.current_function = node.name
         
-        # Check function body
-        for stmt in node.body:
-            self.visit(stmt)
-        
-        self.current_function = None
+        # Check function body, then leave the function
+        self._schedule(node.body + [partial(setattr, self, 'current_function', None)])
+    
+    def infer_type(self, node: ASTNode) -> int:
+        """Infer the type code of an expression"""
+        infer = self._INFER_DISPATCH.get(type(node))
+        if infer is None:
+            # Default fallback
+            return TYPE_INT
+        return infer(self, node)
+    
+    def _infer_literal(self, node: Literal) -> int:
+        """Literal: its own type"""
+        return self.type_code(node.literal_type)
     
-    def infer_type(self, node: ASTNode) -> str:
-        """Infer the type of an expression"""
-        if isinstance(node, Literal):
-            return node.literal_type
+    def _infer_identifier(self, node: Identifier) -> int:
+        """Variable: its declared type"""
+        var_type = self.symbol_table.get(node.name)
+        if var_type is None:
+            return self.undefined_variable(node.name, node.line)
+        return var_type
+    
+    def _infer_binary_op(self, node: BinaryOp) -> int:
+        """Binary operation: numeric result, comparison or logical int"""
+        left_type = self.infer_type(node.left)
+        right_type = self.infer_type(node.right)
+        if left_type == TYPE_ERROR or right_type == TYPE_ERROR:
+            return TYPE_ERROR
         
-        elif isinstance(node, Identifier):
-            if node.name not in self.symbol_table:
-                raise TypeCheckError(
-                    f"Undefined variable '{node.name}'",
+        # Arithmetic operations
+        if node.operator in _ARITHMETIC_OPS:
+            if left_type <= TYPE_FLOAT and right_type <= TYPE_FLOAT:
+                # If either is float, result is float
+                return max(left_type, right_type)
+            else:
+                return self.error(
+                    f"Binary operation '{node.operator}' not supported between "
+                    f"'{self.type_name(left_type)}' and '{self.type_name(right_type)}'",
                     node.line
                 )
-            return self.symbol_table[node.name]
-        
-        elif isinstance(node, BinaryOp):
-            left_type = self.infer_type(node.left)
-            right_type = self.infer_type(node.right)
-            
-            # Arithmetic operations
-            if node.operator in ['+', '-', '*', '/', '%']:
-                if left_type in ['int', 'float'] and right_type in ['int', 'float']:
-                    # If either is float, result is float
-                    return 'float' if 'float' in [left_type, right_type] else 'int'
-                else:
-                    raise TypeCheckError(
-                        f"Binary operation '{node.operator}' not supported between '{left_type}' and '{right_type}'",
-                        node.line
-                    )
-            
-            # Comparison operations return int (used as boolean)
-            elif node.operator in ['<', '>', '<=', '>=', '==', '!=']:
-                if left_type in ['int', 'float'] and right_type in ['int', 'float']:
-                    return 'int'
-                else:
-                    raise TypeCheckError(
-                        f"Comparison '{node.operator}' not supported between '{left_type}' and '{right_type}'",
-                        node.line
-                    )
-            
-            # Logical operations
-            elif node.operator in ['&&', '||']:
-                return 'int'
-            
-            return left_type  # Default
-        
-        elif isinstance(node, UnaryOp):
-            operand_type = self.infer_type(node.operand)
-            if node.operator in ['++', '--']:
-                if operand_type not in ['int', 'float']:
-                    raise TypeCheckError(
-                        f"Unary operation '{node.operator}' requires numeric type, got '{operand_type}'",
-                        node.line
-                    )
-            return operand_type
         
-        elif isinstance(node, ArrayAccess):
-            array_type = self.infer_type(node.array)
-            if not array_type.endswith('[]'):
-                raise TypeCheckError(
-                    f"Cannot index into non-array type '{array_type}'",
+        # Comparison operations return int (used as boolean)
+        elif node.operator in _COMPARISON_OPS:
+            if left_type <= TYPE_FLOAT and right_type <= TYPE_FLOAT:
+                return TYPE_INT
+            else:
+                return self.error(
+                    f"Comparison '{node.operator}' not supported between "
+                    f"'{self.type_name(left_type)}' and '{self.type_name(right_type)}'",
                     node.line
                 )
-            
-            index_type = self.infer_type(node.index)
-            if index_type != 'int':
-                raise TypeCheckError(
-                    f"Array index must be 'int', got '{index_type}'",
+        
+        # Logical operations
+        elif node.operator in _LOGICAL_OPS:
+            return TYPE_INT
+        
+        return left_type  # Default
+    
+    def _infer_unary_op(self, node: UnaryOp) -> int:
+        """Unary operation: the operand type"""
+        operand_type = self.infer_type(node.operand)
+        if node.operator in _STEP_OPS:
+            if operand_type > TYPE_FLOAT:
+                return self.error(
+                    f"Unary operation '{node.operator}' requires numeric type, got '{self.type_name(operand_type)}'",
                     node.line
                 )
-            
-            # Return element type
-            return array_type[:-2]  # Remove []
+        return operand_type
+    
+    def _infer_array_access(self, node: ArrayAccess) -> int:
+        """Array access: the element type"""
+        array_type = self.infer_type(node.array)
+        if array_type == TYPE_ERROR:
+            return TYPE_ERROR
+        if not array_type & ARRAY_BIT:
+            return self.error(
+                f"Cannot index into non-array type '{self.type_name(array_type)}'",
+                node.line
+            )
         
-        elif isinstance(node, MemberAccess):
-            # Simplified - just pass through the base type
-            base_type = self.infer_type(node.object)
-            # For now, assume members have same type as base
-            return 'int'  # Default
+        index_type = self.infer_type(node.index)
+        if index_type != TYPE_INT and index_type != TYPE_ERROR:
+            self.error(
+                f"Array index must be 'int', got '{self.type_name(index_type)}'",
+                node.line
+            )
         
-        # Default fallback
-        return 'int'
+        # Return element type
+        return array_type & ~ARRAY_BIT
     
-    def types_compatible(self, target_type: str, value_type: str) -> bool:
-        """Check if types are compatible for assignment"""
-        if target_type == value_type:
-            return True
-        
+    def _infer_member_access(self, node: MemberAccess) -> int:
+        """Member access: int until members are tracked"""
+        # Every link of a chain like a.b.c is int, so only the base object
+        # needs checking (it may be undefined)
+        base = node.object
+        while type(base) is MemberAccess:
+            base = base.object
+        self.infer_type(base)
+        return TYPE_INT  # Default
+    
+    def types_compatible(self, target_type: int, value_type: int) -> bool:
+        """Check if type codes are compatible for assignment"""
         # int and float are somewhat compatible
-        if target_type == 'float' and value_type == 'int':
-            return True
-        
-        return False
+        return (target_type == value_type
+                or target_type == TYPE_ERROR or value_type == TYPE_ERROR
+                or (target_type == TYPE_FLOAT and value_type == TYPE_INT))
+    
+    # Statement visitors keyed by exact node class; built once per class
+    _VISIT_DISPATCH = {
+        partial: _run_deferred,
+        Program: visit_program,
+        VariableDeclaration: visit_variable_declaration,
+        ArrayDeclaration: visit_array_declaration,
+        Assignment: visit_assignment,
+        IfStatement: visit_if_statement,
+        WhileStatement: visit_while_statement,
+        ForLoop: visit_for_loop,
+        FunctionDeclaration: visit_function_declaration,
+        ExpressionStatement: visit_expression_statement,
+    }
+    
+    # Type inference keyed the same way
+    _INFER_DISPATCH = {
+        Literal: _infer_literal,
+        Identifier: _infer_identifier,
+        BinaryOp: _infer_binary_op,
+        UnaryOp: _infer_unary_op,
+        ArrayAccess: _infer_array_access,
+        MemberAccess: _infer_member_access,
+    }
@@ -0,0 +1,49 @@
+"""
+Tests for the ClearScript AST cache
+"""
+
+import pickle
+import pytest
+from src.clearscript.ast_cache import load_or_parse
+from src.clearscript.codegen import CodeGenerator
+from src.clearscript.ast_nodes import Program
+
+
+def test_load_or_parse_round_trip(tmp_path):
+    """Test a cached AST generates the same code as a fresh parse."""
+    source = "int x = 5;\nfunction main() { x = x + 1; }"
+    
+    first = load_or_parse(source, cache_dir=tmp_path)
+    assert len(list(tmp_path.iterdir())) == 1
+    
+    second = load_or_parse(source, cache_dir=tmp_path)
+    assert second is not first
+    assert CodeGenerator(second).generate() == CodeGenerator(first).generate()
+
+
+def test_load_or_parse_ignores_corrupt_entry(tmp_path):
+    """Test an unreadable cache entry is replaced by a fresh parse."""
+    source = "int y = 2;"
+    load_or_parse(source, cache_dir=tmp_path)
+    entry = next(tmp_path.iterdir())
+    entry.write_bytes(b"not a pickle")
+    
+    program = load_or_parse(source, cache_dir=tmp_path)
+    assert program.statements[0].name == "y"
+
+
+@pytest.mark.parametrize("payload", [
+    b"\x80\xff",
+    b"cmissing_module\nThing\n.",
+    pickle.dumps([1, 2]),
+    pickle.dumps(5),
+])
+def test_load_or_parse_ignores_unusable_entry(tmp_path, payload):
+    """Test any entry that does not unpickle to a Program is a miss."""
+    source = "int z = 3;"
+    load_or_parse(source, cache_dir=tmp_path)
+    next(tmp_path.iterdir()).write_bytes(payload)
+    
+    program = load_or_parse(source, cache_dir=tmp_path)
+    assert isinstance(program, Program)
+    assert program.statements[0].name == "z"
@@ -0,0 +1,75 @@
+"""
+Tests for ClearScript CLI
+"""
+
+import argparse
+import pytest
+from src.clearscript.cli import compile_batch, compile_file, read_source, _job_count
+
+
+def test_compile_file(tmp_path):
+    """Test compile_file works when called directly."""
+    source = tmp_path / "test.cst"
+    source.write_text("int x = 5;\nx++;\n", encoding="utf-8")
+    
+    assert compile_file(str(source))
+    
+    output = (tmp_path / "test.ss").read_text(encoding="utf-8")
+    assert "INIT x 5" in output
+    assert "INC x" in output
+
+
+def test_compile_file_type_error(tmp_path):
+    """Test type errors fail compilation unless type checking is disabled."""
+    source = tmp_path / "test.cst"
+    source.write_text("int x = 5;\nint[] arr = [1, 2];\nint y = x + arr;\n", encoding="utf-8")
+    
+    assert not compile_file(str(source))
+    assert compile_file(str(source), no_typecheck=True)
+
+
+def test_read_source_normalizes_newlines(tmp_path):
+    """Test read_source matches text-mode newline handling."""
+    source = tmp_path / "test.cst"
+    source.write_bytes(b"int x = 5;\r\nx++;\r\n")
+    empty = tmp_path / "empty.cst"
+    empty.write_bytes(b"")
+    
+    assert read_source(str(source)) == "int x = 5;\nx++;\n"
+    assert read_source(str(empty)) == ""
+
+
+def test_compile_batch_parallel(tmp_path):
+    """Test batch compilation with worker processes."""
+    paths = []
+    for i in range(3):
+        source = tmp_path / f"test{i}.cst"
+        source.write_text(f"int x = {i};\n", encoding="utf-8")
+        paths.append(str(source) + "\n")
+    
+    assert compile_batch(paths + ["\n"], jobs=2)
+    
+    for i in range(3):
+        assert f"INIT x {i}" in (tmp_path / f"test{i}.ss").read_text(encoding="utf-8")
+
+
+def test_compile_batch_parallel_reads_paths_lazily(tmp_path):
+    """Test parallel batches finish early files before reading every path."""
+    def feed():
+        for i in range(8):
+            if i == 5:
+                # The window of 2 * jobs has forced the first file to finish
+                assert (tmp_path / "test0.ss").exists()
+            source = tmp_path / f"test{i}.cst"
+            source.write_text(f"int x = {i};\n", encoding="utf-8")
+            yield str(source)
+    
+    assert compile_batch(feed(), jobs=2)
+
+
+def test_job_count_rejects_non_positive():
+    """Test -j only accepts a positive number of workers."""
+    assert _job_count("3") == 3
+    for value in ("0", "-2"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            _job_count(value)
@@ -6,6 +6,7 @@ import pytest
 from src.clearscript.lexer import Lexer
 from src.clearscript.parser import Parser
 from src.clearscript.codegen import CodeGenerator
+from src.clearscript.ast_nodes import Program, BinaryOp, Identifier, Literal
 
 
 def compile_source(source):
@@ -65,6 +66,22 @@ def test_if_statement():
     assert "GOTO" in output
 
 
+def test_condition_braces_not_doubled():
+    """Test conditions are wrapped in a single pair of braces."""
+    source = """
+    int x = 5;
+    if (x > 3) {
+        x = 0;
+    }
+    waitfor(x == 0);
+    """
+    output = compile_source(source)
+    
+    assert "CALLIF _if_then_1 {x > 3}" in output
+    assert "WAITFOR {x == 0}" in output
+    assert "{{" not in output
+
+
 def test_while_loop():
     """Test while loop generates loop labels."""
     source = """
@@ -80,6 +97,23 @@ def test_while_loop():
     assert "INC x" in output
 
 
+def test_loop_exit_condition_negated():
+    """Test loop exits flip comparisons instead of wrapping them in !()."""
+    source = """
+    int x = 0;
+    while (x < 10) {
+        x++;
+    }
+    while (!x) {
+        x++;
+    }
+    """
+    output = compile_source(source)
+    
+    assert "GOTO _while_end_2 {x >= 10}" in output
+    assert "GOTO _while_end_4 {x}" in output
+
+
 def test_expressions_wrapped():
     """Test expressions are wrapped in {}."""
     source = "int x = 5 + 3;"
@@ -124,6 +158,19 @@ def test_increment():
     assert "INC x" in output
 
 
+def test_for_loop_assignment_increment():
+    """Test an assignment in a for-loop increment is generated as SET."""
+    source = """
+    int x = 0;
+    for (int i = 0; i < 10; i = i + 2) {
+        x++;
+    }
+    """
+    output = compile_source(source)
+    
+    assert "INC x\nSET i {i + 2}\nGOTO _for_1" in output
+
+
 def test_complete_example():
     """Test complete example compiles correctly."""
     source = """
@@ -148,3 +195,83 @@ def test_complete_example():
     assert ":start" in output
     assert "CALL increment" in output
     assert "KILL" in output
+
+
+def test_generate_is_repeatable():
+    """Test generating twice from one AST gives the same output."""
+    source = """
+    int x = 0;
+    while (x < 10) {
+        x = x + 1;
+    }
+    """
+    ast = Parser(Lexer(source).tokenize()).parse()
+    codegen = CodeGenerator(ast)
+    
+    assert codegen.generate() == codegen.generate()
+
+
+def test_switch_default_emitted_once():
+    """Test the default body follows the last case check, not every case."""
+    source = """
+    int x = 1;
+    switch (x) {
+        case 1:
+            x = 2;
+            break;
+        case 2:
+            x = 3;
+            break;
+        default:
+            x = 0;
+    }
+    """
+    output = compile_source(source)
+    
+    assert output.count("SET x 0") == 1
+    assert output.endswith(":_case_check_5\nSET x 0\n:_switch_end_1")
+
+
+def test_struct_generates_no_main():
+    """Test top-level struct declarations do not produce an empty main block."""
+    source = """
+    int x = 1;
+    struct Point {
+        int a;
+    }
+    """
+    output = compile_source(source)
+    
+    assert output == "INIT x 1"
+
+
+def test_wrapped_builtin_command():
+    """Test a builtin command wrapped in ExpressionStatement still generates."""
+    from src.clearscript.ast_nodes import ExpressionStatement
+    
+    program = Parser(Lexer("function main() { wait(2); }").tokenize()).parse()
+    body = program.statements[0].body
+    body[0] = ExpressionStatement(expression=body[0])
+    
+    assert "WAIT 2" in CodeGenerator(program).generate()
+
+
+def test_expression_to_string_fresh_temporaries():
+    """Test direct calls never reuse text cached for a freed node."""
+    codegen = CodeGenerator(Program(statements=[]))
+    codegen.generate()
+    
+    for i in range(20):
+        expr = BinaryOp(left=Identifier(name='a%d' % i), operator='+',
+                        right=Literal(value=i, literal_type='int'))
+        assert codegen.expression_to_string(expr) == "{a%d + %d}" % (i, i)
+
+
+def test_literal_rewrite_after_generate():
+    """Test a literal changed after generate() renders its new value."""
+    ast = Parser(Lexer("int x = 5 + 3;").tokenize()).parse()
+    codegen = CodeGenerator(ast)
+    assert "{5 + 3}" in codegen.generate()
+    
+    ast.statements[0].value.left.value = 7
+    assert "{7 + 3}" in codegen.generate()
@@ -86,3 +86,59 @@ def test_comments():
     # Should have comment tokens
     comment_tokens = [t for t in tokens if t.type == TokenType.COMMENT]
     assert len(comment_tokens) == 2
+
+
+def test_positions_across_lines():
+    """Test line and column tracking through multi-line tokens."""
+    source = "x = 'a\nb';\n/* one\ntwo */ y"
+    tokens = Lexer(source).tokenize()
+    
+    assert tokens[2].value == "a\nb"
+    assert (tokens[3].line, tokens[3].column) == (2, 3)
+    assert (tokens[5].line, tokens[5].column) == (4, 8)
+    assert (tokens[-1].line, tokens[-1].column) == (4, 9)
+
+
+def test_lexer_errors():
+    """Test malformed input raises SyntaxError with a position."""
+    with pytest.raises(SyntaxError, match="Unterminated string at 1:5"):
+        Lexer('x = "abc').tokenize()
+    with pytest.raises(SyntaxError, match="Unexpected character '@' at 1:7"):
+        Lexer('x = 1 @ 2').tokenize()
+
+
+def test_iter_tokens_matches_tokenize():
+    """Test the token generator yields the same stream as tokenize()."""
+    source = "int x = 5;\nx++;"
+    streamed = list(Lexer(source).iter_tokens())
+    assert streamed == Lexer(source).tokenize()
+    assert streamed[-1].type == TokenType.EOF
+
+
+def test_tokenize_cached():
+    """Test cached tokenization returns equal, independent lists."""
+    source = "int x = 5;"
+    first = Lexer.tokenize_cached(source)
+    second = Lexer.tokenize_cached(source)
+    assert first == second == Lexer(source).tokenize()
+    assert first is not second
+
+
+def test_number_literals():
+    """Test integer, decimal and exponent number forms."""
+    tokens = Lexer("42 3.5 1. 2e3 1.5E-2").tokenize()
+    values = [t.value for t in tokens if t.type == TokenType.NUMBER]
+    
+    assert values == [42, 3.5, 1.0, 2000.0, 0.015]
+    assert isinstance(values[0], int)
+    assert isinstance(values[3], float)
+
+
+def test_token_type_categories():
+    """Test keyword and operator types form contiguous ranges."""
+    keyword_types = set(Lexer.KEYWORDS.values())
+    
+    for token_type in TokenType:
+        assert Lexer.is_keyword(token_type) == (token_type in keyword_types)
+    assert Lexer.is_operator(TokenType.NEQ)
+    assert not Lexer.is_operator(TokenType.LPAREN)
@@ -108,3 +108,148 @@ def test_label_declaration():
     assert len(program.statements) == 1
     assert isinstance(program.statements[0], LabelDeclaration)
     assert program.statements[0].name == "myLabel"
+
+
+def test_memoize_produces_same_ast():
+    """Test memoized parsing matches the default parser."""
+    source = """
+    int x = 5;
+    while (x > 0 && x < 10) {
+        x = x - 1;
+    }
+    """
+    plain = Parser(Lexer(source).tokenize()).parse()
+    memoized = Parser(Lexer(source).tokenize(), memoize=True).parse()
+    
+    assert plain == memoized
+
+
+def test_comments_dropped_by_default():
+    """Test comments do not become AST nodes unless requested."""
+    source = """
+    // leading comment
+    int x = 5; /* trailing */
+    """
+    program = Parser(Lexer(source).tokenize()).parse()
+    
+    assert len(program.statements) == 1
+    assert isinstance(program.statements[0], VariableDeclaration)
+
+
+def test_comments_inside_expressions_dropped():
+    """Test dropped comments may appear anywhere, not only between statements."""
+    source = """
+    int x = 1 + /* two */ 2;
+    switch (x) {
+        case 3: x = 0;
+        // fall out
+        default: x = 1;
+    }
+    """
+    program = Parser(Lexer(source).tokenize()).parse()
+    
+    assert program.statements[0].value.right.value == 2
+    assert program.statements[1].default_case is not None
+
+
+def test_keep_comments():
+    """Test keep_comments turns statement-level comments into Comment nodes."""
+    source = """
+    // leading comment
+    int x = 5; /* trailing */
+    """
+    program = Parser(Lexer(source).tokenize(), keep_comments=True).parse()
+    
+    assert len(program.statements) == 3
+    assert isinstance(program.statements[0], Comment)
+    assert program.statements[0].text == "leading comment"
+    assert isinstance(program.statements[2], Comment)
+
+
+def test_array_access():
+    """Test parsing array indexing."""
+    source = "x = arr[1];"
+    lexer = Lexer(source)
+    parser = Parser(lexer.tokenize())
+    program = parser.parse()
+    
+    access = program.statements[0].expression.value
+    assert isinstance(access, ArrayAccess)
+    assert isinstance(access.array, Identifier)
+    assert access.array.name == "arr"
+    assert access.index.value == 1
+
+
+def test_parse_incremental_reuses_unchanged_statements():
+    """Test an incremental reparse keeps untouched top-level nodes."""
+    before = "int x = 5;\nfunction main() { x = 1; }"
+    after = "int x = 5;\nfunction main() { x = 2; }"
+    cache = {}
+    
+    first = Parser(Lexer(before).tokenize()).parse_incremental(cache)
+    second = Parser(Lexer(after).tokenize()).parse_incremental(cache)
+    
+    assert second.statements[0] is first.statements[0]
+    assert second.statements[1] is not first.statements[1]
+    assert second == Parser(Lexer(after).tokenize()).parse()
+
+
+def test_binary_operator_precedence():
+    """Test precedence and left associativity of binary operators."""
+    source = "x = a - b - c * d < e || f && g;"
+    program = Parser(Lexer(source).tokenize()).parse()
+    expr = program.statements[0].expression.value
+    
+    assert expr.operator == "||"
+    assert expr.right.operator == "&&"
+    comparison = expr.left
+    assert comparison.operator == "<"
+    subtraction = comparison.left
+    assert subtraction.operator == "-"
+    assert subtraction.left.operator == "-"
+    assert subtraction.right.operator == "*"
+
+
+def test_builtin_commands_are_statements():
+    """Test builtin commands are not wrapped in ExpressionStatement."""
+    source = "wait(1); push(x); thread(loop, 2); spawnbot(t, l);"
+    program = Parser(Lexer(source).tokenize()).parse()
+    
+    assert [type(stmt) for stmt in program.statements] == [
+        WaitStatement, PushStatement, ThreadStatement, SpawnBotCall
+    ]
+
+
+def test_fold_constants():
+    """Test numeric literal arithmetic is folded only when enabled."""
+    source = "int x = 5 + 3 * 2; float y = 1.5 * 2 - x; int z = 2 - 5; int w = 6 / 3;"
+    
+    unfolded = Parser(Lexer(source).tokenize()).parse()
+    assert isinstance(unfolded.statements[0].value, BinaryOp)
+    
+    x, y, z, w = Parser(Lexer(source).tokenize(), fold_constants=True).parse().statements
+    assert x.value == Literal(value=11, literal_type='int', line=1, column=11)
+    assert y.value.left.value == 3.0 and y.value.left.literal_type == 'float'
+    assert y.value.right.name == 'x'
+    assert z.value.operator == '-' and z.value.operand.value == 3
+    assert isinstance(w.value, BinaryOp)
+    
+    # Negative intermediate results keep folding
+    chains = Parser(Lexer("int a = 2 - 5 + 1; int b = (1 - 2) * 3; int c = -2 * -3;").tokenize(),
+                    fold_constants=True).parse()
+    a, b, c = (stmt.value for stmt in chains.statements)
+    assert a.operator == '-' and a.operand.value == 2
+    assert b.operator == '-' and b.operand.value == 3
+    assert c.value == 6 and c.literal_type == 'int'
+    
+    overflow = Parser(Lexer("float f = 1e300 * 1e300;").tokenize(), fold_constants=True).parse()
+    assert isinstance(overflow.statements[0].value, BinaryOp)
+
+
+@pytest.mark.parametrize("keep_comments", [False, True])
+def test_raw_block_drops_comments(keep_comments):
+    """Test comments inside raw blocks never reach the raw code."""
+    source = "raw { SET x 5 // inline note\n /* block */ WAIT 1 }"
+    program = Parser(Lexer(source).tokenize(), keep_comments=keep_comments).parse()
+    
+    assert program.statements[0].code == "SET x 5 WAIT 1"
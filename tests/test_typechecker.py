@@ -0,0 +1,76 @@
+"""
+Tests for the ClearScript type checker
+"""
+
+import pytest
+from src.clearscript.lexer import Lexer
+from src.clearscript.parser import Parser
+from src.clearscript.ast_nodes import Program, WhileStatement, ExpressionStatement, Identifier, Literal
+from src.clearscript.typechecker import (
+    TypeChecker, TypeCheckError, TYPE_INT, TYPE_FLOAT, ARRAY_BIT
+)
+
+
+def check(source):
+    """Type check source and return the error messages."""
+    ast = Parser(Lexer(source).tokenize()).parse()
+    return [str(e) for e in TypeChecker(ast).check()]
+
+
+def test_type_codes_round_trip():
+    """Test type names map to integer codes and back."""
+    checker = TypeChecker(Program())
+    assert checker.type_code('int') == TYPE_INT
+    assert checker.type_code('float[]') == TYPE_FLOAT | ARRAY_BIT
+    assert checker.type_name(checker.type_code('float[]')) == 'float[]'
+    assert checker.type_name(checker.type_code('Bot')) == 'Bot'
+
+
+def test_type_codes_are_per_checker():
+    """Test custom type names do not use up codes across checkers."""
+    for i in range(300):
+        TypeChecker(Program()).type_code(f"C{i}")
+    
+    checker = TypeChecker(Program())
+    assert checker.type_code('Bot') == 3
+    assert checker.type_code('Bot') != checker.type_code('int[]')
+
+
+def test_type_code_limit():
+    """Test running out of base codes is an error, not an array type."""
+    checker = TypeChecker(Program())
+    for i in range(ARRAY_BIT - 3):
+        checker.type_code(f"C{i}")
+    
+    with pytest.raises(TypeCheckError):
+        checker.type_code("OneTooMany")
+
+
+def test_error_messages_use_type_names():
+    """Test errors still report types by name."""
+    assert check('int[] a = [1]; int y = a[1.5];') == [
+        "Line 1: Array index must be 'int', got 'float'"
+    ]
+    assert check('int[] a = [1]; int b = a + 1;') == [
+        "Line 1: Binary operation '+' not supported between 'int[]' and 'int'"
+    ]
+    assert check('float[] a = [1, 2.5]; float v = a[0]; float f = 1 < 2;') == []
+
+
+def test_reports_every_error():
+    """Test checking continues past the first error without repeating it."""
+    assert check('int x = "s"; float y = z; y = z + 1; int[] a = [1, "s", "t"];') == [
+        "Line 1: Cannot initialize variable 'x' of type 'int' with value of type 'string'",
+        "Line 1: Undefined variable 'z'",
+        "Line 1: Array element type 'string' does not match array type 'int[]'",
+    ]
+
+
+def test_deeply_nested_statements():
+    """Test nesting deeper than the recursion limit is checked."""
+    body = [ExpressionStatement(expression=Identifier(name='x'))]
+    for _ in range(5000):
+        body = [WhileStatement(condition=Literal(value=1, literal_type='int'), body=body)]
+    
+    errors = TypeChecker(Program(statements=body)).check()
+    assert [str(e) for e in errors] == ["Undefined variable 'x'"]